@@ -1,8 +1,316 @@
 import json
+import os
 import re
 from collections import defaultdict
+from contextlib import contextmanager, suppress
 from datetime import datetime
 import logging
+from dataclasses import dataclass
+from functools import lru_cache
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import orjson
+except ImportError:  # optional, falls back to the standard json module
+    orjson = None
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+# Page count from which per-page extraction is spread over worker processes
+PARALLEL_MIN_PAGES = 200
+
+# Price patterns, one named group per alternative
+_PRICE_RE = re.compile('|'.join([
+    # Rs. 2500, Rs.2500, Rs 2500
+    r'Rs\.?\s*(?P<rs>\d{1,3}(?:,\d{3})*(?:\.\d{2})?)',
+    # LKR 2500, LKR2500
+    r'LKR\.?\s*(?P<lkr>\d{1,3}(?:,\d{3})*(?:\.\d{2})?)',
+    # 2500/-, 2500/-
+    r'(?P<dash>\d{1,3}(?:,\d{3})*(?:\.\d{2})?)\s*/-',
+    # /month, per month with price
+    r'(?P<monthly>\d{1,3}(?:,\d{3})*(?:\.\d{2})?)\s*(?:/month|per month|monthly)',
+    # Price in Sinhala context (රු.)
+    r'රු\.?\s*(?P<rupee>\d{1,3}(?:,\d{3})*(?:\.\d{2})?)'
+]), re.IGNORECASE)
+
+# Speed patterns (Mbps, GB/s, etc.)
+_SPEED_RE = re.compile('|'.join([
+    r'(?P<mbps>\d+(?:\.\d+)?)\s*Mbps',
+    r'(?P<mb_s>\d+(?:\.\d+)?)\s*MB/s',
+    r'(?P<gb_s>\d+(?:\.\d+)?)\s*GB/s'
+]), re.IGNORECASE)
+
+# Data limit patterns: a GB/TB quantity (but not a Gbps or GB/s speed),
+# or "unlimited" with optional "data"
+_DATA_RE = re.compile(
+    r'(?P<num>\d+(?:\.\d+)?)\s*(?P<unit>GB|TB)(?!ps|/s)|(?P<unl>unlimited(?:\s+data)?)',
+    re.IGNORECASE
+)
+
+# Phone number patterns (Sri Lankan format)
+_PHONE_RE = re.compile('|'.join([
+    r'\b(?:\+94|0094|0)\s*\d{2}\s*\d{7}\b',  # +94 11 1234567
+    r'\b\d{3}-\d{7}\b',  # 011-1234567
+    r'\b\d{10}\b'  # 0111234567
+]))
+
+_EMAIL_PATTERN = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b')
+
+def _trie_regex(words) -> str:
+    """Build an alternation of literal words factored on shared prefixes"""
+    trie = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[''] = {}
+    
+    def build(node):
+        alternatives = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not alternatives:
+            return ''
+        body = alternatives[0] if len(alternatives) == 1 else '(?:' + '|'.join(alternatives) + ')'
+        # A word may end at this node, so the longer continuations are optional
+        return f'(?:{body})?' if '' in node else body
+    
+    return build(trie)
+
+# Common features
+_FEATURE_KEYWORDS = (
+    'fiber', 'fibre', 'adsl', '4g', 'lte', 'wifi', 'wi-fi',
+    'peotv', 'iptv', 'telephone', 'voice', 'email', 'cloud',
+    'free installation', 'free router', 'unlimited', 'fixed'
+)
+# Matched against lowercased text. The zero-width lookahead tries every start
+# position, so a keyword inside another one's match (email in voicemail) is still found.
+_FEATURE_RE = re.compile(f'(?=({_trie_regex(_FEATURE_KEYWORDS)}))')
+
+# Every byte value except ASCII letters, for bytes.translate(None, ...)
+_NON_ASCII_ALPHA = bytes(b for b in range(256) if not (0x41 <= b <= 0x5A or 0x61 <= b <= 0x7A))
+
+def _script_counts(text: str) -> tuple:
+    """Number of Sinhala and English letters in text"""
+    # Count Sinhala Unicode characters (0D80-0DFF range). In UTF-8 every one
+    # of them starts with E0 B6 or E0 B7, and E0 only ever begins a character.
+    encoded = text.encode('utf-8', 'surrogatepass')
+    sinhala_chars = encoded.count(b'\xe0\xb6') + encoded.count(b'\xe0\xb7')
+    # Count English letters
+    english_chars = len(text.encode('ascii', 'ignore').translate(None, _NON_ASCII_ALPHA))
+    return sinhala_chars, english_chars
+
+@lru_cache(maxsize=100_000)
+def _detect_language(text: str) -> str:
+    """Detect if text is English, Sinhala, or Mixed"""
+    if not text or not text.strip():
+        return "empty"
+    return _classify_language(*_script_counts(text))
+
+def _classify_language(sinhala_chars: int, english_chars: int) -> str:
+    """Language label from Sinhala and English letter counts"""
+    total_alpha_chars = sinhala_chars + english_chars
+    
+    if total_alpha_chars == 0:
+        return "no_text"
+    
+    sinhala_ratio = sinhala_chars / total_alpha_chars
+    english_ratio = english_chars / total_alpha_chars
+    
+    if sinhala_ratio > 0.7:
+        return "sinhala"
+    elif english_ratio > 0.7:
+        return "english"
+    elif sinhala_ratio > 0.1 and english_ratio > 0.1:
+        return "mixed"
+    else:
+        return "other"
+
+def _slice_context(text: str, start: int, end: int, context_length: int = 50) -> str:
+    """Get context around the span text[start:end]"""
+    ctx_start = max(0, start - context_length)
+    ctx_end = min(len(text), end + context_length)
+    
+    # Build the marked-up context in one step instead of concatenating onto the slice
+    prefix = "..." if ctx_start > 0 else ""
+    suffix = "..." if ctx_end < len(text) else ""
+    return f"{prefix}{text[ctx_start:ctx_end]}{suffix}".strip()
+
+@dataclass(slots=True)
+class PriceHit:
+    value: float
+    original: str
+    context: str
+
+def _extract_prices(text: str) -> list:
+    """Extract price information from text"""
+    prices = []
+    
+    for m in _PRICE_RE.finditer(text):
+        group = m.lastgroup
+        match = m.group(group)
+        # Convert price to standard format (remove commas)
+        price_value = float(match.replace(',', ''))
+        prices.append(PriceHit(
+            value=price_value,
+            original=match,
+            context=_slice_context(text, m.start(group), m.end(group))
+        ))
+    
+    return prices
+
+def _extract_package_details(text: str) -> dict:
+    """Extract package/plan details from text"""
+    details = {
+        'speeds': [],
+        'data_limits': [],
+        'features': []
+    }
+    
+    for m in _SPEED_RE.finditer(text):
+        group = m.lastgroup
+        details['speeds'].append({
+            'value': float(m.group(group)),
+            'context': _slice_context(text, m.start(group), m.end(group))
+        })
+    
+    for m in _DATA_RE.finditer(text):
+        if m.lastgroup == 'unl':
+            details['data_limits'].append({
+                'type': 'unlimited',
+                'context': _slice_context(text, m.start('unl'), m.end('unl'))
+            })
+        else:
+            details['data_limits'].append({
+                'value': float(m.group('num')),
+                'unit': m.group('unit').upper(),
+                'context': _slice_context(text, m.start('num'), m.end('num'))
+            })
+    
+    # First occurrence of each feature keyword, found in one pass
+    first_hits = {}
+    for m in _FEATURE_RE.finditer(text.lower()):
+        first_hits.setdefault(m.group(1), m.start())
+    
+    for feature in _FEATURE_KEYWORDS:
+        if feature in first_hits:
+            start = first_hits[feature]
+            details['features'].append({
+                'feature': feature,
+                'context': _slice_context(text, start, start + len(feature))
+            })
+    
+    return details
+
+def _extract_contact_info(text: str) -> dict:
+    """Extract contact information from text"""
+    contact = {
+        'phone_numbers': [],
+        'email_addresses': [],
+        'addresses': []
+    }
+    
+    for m in _PHONE_RE.finditer(text):
+        contact['phone_numbers'].append({
+            'number': m.group(),
+            'context': _slice_context(text, m.start(), m.end())
+        })
+    
+    # Email patterns
+    for m in _EMAIL_PATTERN.finditer(text):
+        contact['email_addresses'].append({
+            'email': m.group(),
+            'context': _slice_context(text, m.start(), m.end())
+        })
+    
+    return contact
+
+def _cluster_prices(values: list, tolerance: float = 0.1) -> list:
+    """Start index of each group of ascending values lying within tolerance of the group's first value"""
+    starts = []
+    head = 0.0
+    for i, value in enumerate(values):
+        if not starts or value - head >= tolerance * head:
+            starts.append(i)
+            head = value
+    return starts
+
+def _price_lists_match(prices1: list, prices2: list, tolerance: float = 0.05) -> bool:
+    """Check if two price lists are essentially the same"""
+    if len(prices1) != len(prices2):
+        return False
+    
+    for p1, p2 in zip(sorted(prices1), sorted(prices2)):
+        if abs(p1 - p2) > tolerance * max(p1, p2):  # More than 5% difference
+            return False
+    
+    return True
+
+def _canonical_url(url: str) -> str:
+    """URL with the /en/ or /si/ language segment removed"""
+    return url.replace('/en/', '/').replace('/si/', '/')
+
+def _page_sources(page_data: dict):
+    """Yield a page's title, text and each OCR text in reading order"""
+    yield page_data.get('title', '')
+    yield page_data.get('text', '')
+    for img in page_data.get('ocr_images', []):
+        ocr_text = img.get('text', '')
+        if ocr_text:
+            yield ocr_text
+
+def _process_page(item: tuple) -> tuple:
+    """Run every extractor over each of a page's text sources and merge the results"""
+    url, page_data = item
+    prices = []
+    package_details = {'speeds': [], 'data_limits': [], 'features': []}
+    contact_info = {'phone_numbers': [], 'email_addresses': [], 'addresses': []}
+    features = {}
+    sinhala_chars = english_chars = 0
+    has_text = False
+    
+    # Each source is scanned on its own so no combined page string is built
+    for source in _page_sources(page_data):
+        if not source:
+            continue
+        prices.extend(_extract_prices(source))
+        
+        details = _extract_package_details(source)
+        package_details['speeds'].extend(details['speeds'])
+        package_details['data_limits'].extend(details['data_limits'])
+        for feature in details['features']:
+            features.setdefault(feature['feature'], feature)
+        
+        for key, values in _extract_contact_info(source).items():
+            contact_info[key].extend(values)
+        
+        sinhala, english = _script_counts(source)
+        sinhala_chars += sinhala
+        english_chars += english
+        has_text = has_text or not source.isspace()
+    
+    package_details['features'] = [features[k] for k in _FEATURE_KEYWORDS if k in features]
+    
+    return url, {
+        'prices': prices,
+        'package_details': package_details,
+        'contact_info': contact_info,
+        'language': _classify_language(sinhala_chars, english_chars) if has_text else "empty",
+        'canonical_url': _canonical_url(url),
+        'feature_set': frozenset(features)
+    }
+
+@contextmanager
+def _atomic_open(path: str, mode: str = 'w', **kwargs):
+    """Open a temporary file that replaces path only once it has been fully written"""
+    tmp_path = f"{path}.tmp"
+    try:
+        with open(tmp_path, mode, **kwargs) as f:
+            yield f
+    except BaseException:
+        with suppress(OSError):
+            os.remove(tmp_path)
+        raise
+    os.replace(tmp_path, path)
 
 class ContentConsistencyAnalyzer:
     def __init__(self, json_file_path: str):
@@ -15,18 +323,20 @@ class ContentConsistencyAnalyzer:
             'translation_mismatches': [],
             'contact_info_discrepancies': []
         }
-        
-        # Setup logging
-        logging.basicConfig(level=logging.INFO)
-        self.logger = logging.getLogger(__name__)
+        self._page_cache = None
+        self.logger = logger
         
         self.load_data()
     
     def load_data(self):
         """Load JSON data from file"""
         try:
-            with open(self.json_file_path, 'r', encoding='utf-8') as f:
-                self.data = json.load(f)
+            if orjson is not None:
+                with open(self.json_file_path, 'rb') as f:
+                    self.data = orjson.loads(f.read())
+            else:
+                with open(self.json_file_path, 'r', encoding='utf-8') as f:
+                    self.data = json.load(f)
             self.logger.info(f"Loaded data from {self.json_file_path} with {len(self.data)} pages")
         except Exception as e:
             self.logger.error(f"Error loading data: {e}")
@@ -34,175 +344,33 @@ class ContentConsistencyAnalyzer:
     
     def detect_language(self, text: str) -> str:
         """Detect if text is English, Sinhala, or Mixed"""
-        if not text or not text.strip():
-            return "empty"
-        
-        # Count Sinhala Unicode characters (0D80-0DFF range)
-        sinhala_chars = sum(1 for char in text if '\u0D80' <= char <= '\u0DFF')
-        # Count English letters
-        english_chars = sum(1 for char in text if char.isalpha() and ord(char) < 128)
-        
-        total_alpha_chars = sinhala_chars + english_chars
-        
-        if total_alpha_chars == 0:
-            return "no_text"
-        
-        sinhala_ratio = sinhala_chars / total_alpha_chars
-        english_ratio = english_chars / total_alpha_chars
-        
-        if sinhala_ratio > 0.7:
-            return "sinhala"
-        elif english_ratio > 0.7:
-            return "english"
-        elif sinhala_ratio > 0.1 and english_ratio > 0.1:
-            return "mixed"
-        else:
-            return "other"
+        return _detect_language(text)
     
     def extract_prices(self, text: str) -> list:
         """Extract price information from text"""
-        prices = []
-        
-        # Price patterns
-        patterns = [
-            # Rs. 2500, Rs.2500, Rs 2500
-            r'Rs\.?\s*(\d{1,3}(?:,\d{3})*(?:\.\d{2})?)',
-            # LKR 2500, LKR2500
-            r'LKR\.?\s*(\d{1,3}(?:,\d{3})*(?:\.\d{2})?)',
-            # 2500/-, 2500/-
-            r'(\d{1,3}(?:,\d{3})*(?:\.\d{2})?)\s*/-',
-            # /month, per month with price
-            r'(\d{1,3}(?:,\d{3})*(?:\.\d{2})?)\s*(?:/month|per month|monthly)',
-            # Price in Sinhala context (රු.)
-            r'රු\.?\s*(\d{1,3}(?:,\d{3})*(?:\.\d{2})?)'
-        ]
-        
-        for pattern in patterns:
-            matches = re.findall(pattern, text, re.IGNORECASE)
-            for match in matches:
-                # Convert price to standard format (remove commas)
-                price_value = float(match.replace(',', ''))
-                prices.append({
-                    'value': price_value,
-                    'original': match,
-                    'context': self.get_price_context(text, match)
-                })
-        
-        return prices
-    
-    def get_price_context(self, text: str, price: str, context_length: int = 50) -> str:
-        """Get context around a price mention"""
-        price_index = text.lower().find(price.lower())
-        if price_index == -1:
-            return ""
-        
-        start = max(0, price_index - context_length)
-        end = min(len(text), price_index + len(price) + context_length)
-        
-        context = text[start:end]
-        if start > 0:
-            context = "..." + context
-        if end < len(text):
-            context = context + "..."
-        
-        return context.strip()
+        return _extract_prices(text)
     
     def extract_package_details(self, text: str) -> dict:
         """Extract package/plan details from text"""
-        details = {
-            'speeds': [],
-            'data_limits': [],
-            'features': []
-        }
-        
-        # Speed patterns (Mbps, GB/s, etc.)
-        speed_patterns = [
-            r'(\d+(?:\.\d+)?)\s*Mbps',
-            r'(\d+(?:\.\d+)?)\s*mbps',
-            r'(\d+(?:\.\d+)?)\s*MB/s',
-            r'(\d+(?:\.\d+)?)\s*GB/s'
-        ]
-        
-        for pattern in speed_patterns:
-            matches = re.findall(pattern, text, re.IGNORECASE)
-            for match in matches:
-                details['speeds'].append({
-                    'value': float(match),
-                    'context': self.get_price_context(text, match)
-                })
-        
-        # Data limit patterns
-        data_patterns = [
-            r'(\d+(?:\.\d+)?)\s*GB',
-            r'(\d+(?:\.\d+)?)\s*TB',
-            r'unlimited\s+data',
-            r'unlimited'
-        ]
-        
-        for pattern in data_patterns:
-            matches = re.findall(pattern, text, re.IGNORECASE)
-            for match in matches:
-                if isinstance(match, str) and 'unlimited' in match.lower():
-                    details['data_limits'].append({
-                        'type': 'unlimited',
-                        'context': self.get_price_context(text, match)
-                    })
-                else:
-                    details['data_limits'].append({
-                        'value': float(match) if match.replace('.', '').isdigit() else match,
-                        'context': self.get_price_context(text, str(match))
-                    })
-        
-        # Common features
-        feature_keywords = [
-            'fiber', 'fibre', 'adsl', '4g', 'lte', 'wifi', 'wi-fi',
-            'peotv', 'iptv', 'telephone', 'voice', 'email', 'cloud',
-            'free installation', 'free router', 'unlimited', 'fixed'
-        ]
-        
-        text_lower = text.lower()
-        for feature in feature_keywords:
-            if feature in text_lower:
-                details['features'].append({
-                    'feature': feature,
-                    'context': self.get_price_context(text, feature)
-                })
-        
-        return details
+        return _extract_package_details(text)
     
     def extract_contact_info(self, text: str) -> dict:
         """Extract contact information from text"""
-        contact = {
-            'phone_numbers': [],
-            'email_addresses': [],
-            'addresses': []
-        }
-        
-        # Phone number patterns (Sri Lankan format)
-        phone_patterns = [
-            r'\b(?:\+94|0094|0)\s*\d{2}\s*\d{7}\b',  # +94 11 1234567
-            r'\b\d{3}-\d{7}\b',  # 011-1234567
-            r'\b\d{10}\b'  # 0111234567
-        ]
-        
-        for pattern in phone_patterns:
-            matches = re.findall(pattern, text)
-            for match in matches:
-                contact['phone_numbers'].append({
-                    'number': match,
-                    'context': self.get_price_context(text, match)
-                })
-        
-        # Email patterns
-        email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
-        email_matches = re.findall(email_pattern, text)
-        for email in email_matches:
-            contact['email_addresses'].append({
-                'email': email,
-                'context': self.get_price_context(text, email)
-            })
+        return _extract_contact_info(text)
+    
+    def _preprocess_pages(self) -> dict:
+        """Build the combined text and extracted details for every page once"""
+        if self._page_cache is not None:
+            return self._page_cache
+        
+        # Worker processes only pay off once there is enough text to extract
+        if len(self.data) >= PARALLEL_MIN_PAGES:
+            with ProcessPoolExecutor() as executor:
+                self._page_cache = dict(executor.map(_process_page, self.data.items(), chunksize=32))
+        else:
+            self._page_cache = dict(map(_process_page, self.data.items()))
         
-        return contact
+        return self._page_cache
     
     def analyze_pricing_consistency(self):
         """Find pricing inconsistencies across pages"""
@@ -211,24 +379,10 @@ class ContentConsistencyAnalyzer:
         # Group prices by product/service type
         price_groups = defaultdict(list)
         
-        for url, page_data in self.data.items():
-            text = page_data.get('text', '')
-            title = page_data.get('title', '')
-            
-            # Extract prices from both text and OCR
-            all_text = f"{title} {text}"
-            
-            # Add OCR text
-            for img in page_data.get('ocr_images', []):
-                ocr_text = img.get('text', '')
-                if ocr_text:
-                    all_text += f" {ocr_text}"
-            
-            prices = self.extract_prices(all_text)
-            
-            for price in prices:
+        for url, page_info in self._preprocess_pages().items():
+            for price in page_info['prices']:
                 # Try to categorize the price based on context
-                context_lower = price['context'].lower()
+                context_lower = price.context.lower()
                 category = 'unknown'
                 
                 if any(word in context_lower for word in ['fiber', 'fibre', 'fttx']):
@@ -244,41 +398,28 @@ class ContentConsistencyAnalyzer:
                 
                 price_groups[category].append({
                     'url': url,
-                    'price': price['value'],
-                    'original': price['original'],
-                    'context': price['context'],
-                    'language': self.detect_language(price['context'])
+                    'price': price.value,
+                    'original': price.original,
+                    'context': price.context,
+                    'language': self.detect_language(price.context)
                 })
         
         # Find inconsistencies within each category
         for category, prices in price_groups.items():
+            # Zero-valued mentions ("Rs. 0" installation etc.) are free items,
+            # not a price point to compare against
+            prices = sorted((p for p in prices if p['price'] > 0), key=lambda p: p['price'])
             if len(prices) > 1:
-                # Group by similar price values (within 10% range)
-                price_values = [p['price'] for p in prices]
-                unique_prices = []
-                
-                for price_info in prices:
-                    price_val = price_info['price']
-                    is_duplicate = False
-                    
-                    for existing_group in unique_prices:
-                        existing_price = existing_group[0]['price']
-                        # Consider prices within 10% as potentially the same service
-                        if abs(price_val - existing_price) / existing_price < 0.1:
-                            existing_group.append(price_info)
-                            is_duplicate = True
-                            break
-                    
-                    if not is_duplicate:
-                        unique_prices.append([price_info])
+                # Group by similar price values (within 10% range) in one sweep
+                # over the sorted prices; each group is headed by its lowest price
+                starts = _cluster_prices([p['price'] for p in prices], 0.1)
+                bounds = zip(starts, starts[1:] + [len(prices)])
+                unique_prices = [prices[start:end] for start, end in bounds]
                 
                 # Report significant price differences
                 if len(unique_prices) > 1:
-                    price_ranges = [(group[0]['price'], len(group)) for group in unique_prices]
-                    price_ranges.sort()
-                    
-                    min_price = price_ranges[0][0]
-                    max_price = price_ranges[-1][0]
+                    min_price = unique_prices[0][0]['price']
+                    max_price = unique_prices[-1][0]['price']
                     
                     # Only report if there's a significant difference (more than 20%)
                     if (max_price - min_price) / min_price > 0.2:
@@ -303,32 +444,21 @@ class ContentConsistencyAnalyzer:
         
         package_details = {}
         
-        for url, page_data in self.data.items():
-            text = page_data.get('text', '')
-            title = page_data.get('title', '')
-            
-            all_text = f"{title} {text}"
-            
-            # Add OCR text
-            for img in page_data.get('ocr_images', []):
-                ocr_text = img.get('text', '')
-                if ocr_text:
-                    all_text += f" {ocr_text}"
-            
-            details = self.extract_package_details(all_text)
+        for url, page_info in self._preprocess_pages().items():
+            details = page_info['package_details']
             
             if details['speeds'] or details['data_limits'] or details['features']:
                 package_details[url] = {
                     'details': details,
-                    'language': self.detect_language(all_text)
+                    'language': page_info['language'],
+                    'feature_set': page_info['feature_set']
                 }
         
         # Find packages with same features but different details
         feature_groups = defaultdict(list)
         
         for url, data in package_details.items():
-            features = [f['feature'] for f in data['details']['features']]
-            feature_key = '-'.join(sorted(features))
+            feature_key = data['feature_set']
             
             if feature_key:
                 feature_groups[feature_key].append({
@@ -341,6 +471,8 @@ class ContentConsistencyAnalyzer:
         # Check for inconsistencies within feature groups
         for feature_key, packages in feature_groups.items():
             if len(packages) > 1:
+                feature_group = '-'.join(sorted(feature_key))
+                
                 # Check speed inconsistencies
                 all_speeds = []
                 for pkg in packages:
@@ -349,7 +481,7 @@ class ContentConsistencyAnalyzer:
                 if all_speeds and len(set(all_speeds)) > 1:
                     self.inconsistencies['package_details_discrepancies'].append({
                         'type': 'speed_inconsistency',
-                        'feature_group': feature_key,
+                        'feature_group': feature_group,
                         'speed_variations': list(set(all_speeds)),
                         'packages': packages
                     })
@@ -366,7 +498,7 @@ class ContentConsistencyAnalyzer:
                 if data_limit_types and len(set(data_limit_types)) > 1:
                     self.inconsistencies['package_details_discrepancies'].append({
                         'type': 'data_limit_inconsistency',
-                        'feature_group': feature_key,
+                        'feature_group': feature_group,
                         'data_variations': list(set(data_limit_types)),
                         'packages': packages
                     })
@@ -380,26 +512,8 @@ class ContentConsistencyAnalyzer:
         sinhala_pages = {}
         mixed_pages = {}
         
-        for url, page_data in self.data.items():
-            text = page_data.get('text', '')
-            title = page_data.get('title', '')
-            
-            all_text = f"{title} {text}"
-            
-            # Add OCR text
-            for img in page_data.get('ocr_images', []):
-                ocr_text = img.get('text', '')
-                if ocr_text:
-                    all_text += f" {ocr_text}"
-            
-            language = self.detect_language(all_text)
-            
-            page_info = {
-                'text': all_text,
-                'prices': self.extract_prices(all_text),
-                'package_details': self.extract_package_details(all_text),
-                'contact_info': self.extract_contact_info(all_text)
-            }
+        for url, page_info in self._preprocess_pages().items():
+            language = page_info['language']
             
             if language == 'english':
                 english_pages[url] = page_info
@@ -417,59 +531,100 @@ class ContentConsistencyAnalyzer:
     
     def compare_cross_language_consistency(self, pages1, pages2, lang1, lang2):
         """Compare pages between two languages for consistency"""
-        
+        # Pages with the same path once the language segment is dropped are
+        # translations of each other; bucket them so they pair up directly
+        buckets = defaultdict(list)
+        for url2, info2 in pages2.items():
+            buckets[info2['canonical_url']].append(url2)
+        
+        unmatched1 = []
+        matched2 = set()
         for url1, info1 in pages1.items():
-            for url2, info2 in pages2.items():
-                # Check if pages might be translations of each other
-                # (simplified check based on similar URL structure or similar content structure)
-                
+            partners = buckets.get(info1['canonical_url'])
+            if not partners:
+                unmatched1.append(url1)
+                continue
+            for url2 in partners:
+                self.compare_translation_pair(url1, info1, url2, pages2[url2], lang1, lang2)
+            matched2.update(partners)
+        
+        # Fall back to the content heuristics only for pages without a URL
+        # counterpart. Index those pages by price count and by feature so each
+        # page is only tested against pages that can pass might_be_translations
+        unmatched2 = [url2 for url2 in pages2 if url2 not in matched2]
+        by_price_count = defaultdict(set)
+        by_feature = defaultdict(set)
+        for order, url2 in enumerate(unmatched2):
+            info2 = pages2[url2]
+            by_price_count[len(info2['prices'])].add(order)
+            for feature in info2['feature_set']:
+                by_feature[feature].add(order)
+        
+        for url1 in unmatched1:
+            info1 = pages1[url1]
+            candidates = set()
+            price_count = len(info1['prices'])
+            if price_count > 0:
+                for count in (price_count - 1, price_count, price_count + 1):
+                    candidates.update(by_price_count.get(count, ()))
+            for feature in info1['feature_set']:
+                candidates.update(by_feature.get(feature, ()))
+            
+            for order in sorted(candidates):
+                url2 = unmatched2[order]
+                info2 = pages2[url2]
                 if self.might_be_translations(url1, url2, info1, info2):
-                    # Compare prices
-                    prices1 = [p['value'] for p in info1['prices']]
-                    prices2 = [p['value'] for p in info2['prices']]
-                    
-                    if prices1 and prices2:
-                        # Check if price lists are significantly different
-                        if not self.price_lists_match(prices1, prices2):
-                            self.inconsistencies['translation_mismatches'].append({
-                                'type': 'price_mismatch_between_languages',
-                                'url1': url1,
-                                'url2': url2,
-                                'language1': lang1,
-                                'language2': lang2,
-                                'prices1': prices1,
-                                'prices2': prices2,
-                                'difference': 'Prices differ between language versions'
-                            })
-                    
-                    # Compare package features
-                    features1 = [f['feature'] for f in info1['package_details']['features']]
-                    features2 = [f['feature'] for f in info2['package_details']['features']]
-                    
-                    if features1 and features2:
-                        # Check feature consistency
-                        features1_set = set(features1)
-                        features2_set = set(features2)
-                        
-                        if features1_set != features2_set:
-                            missing_in_lang2 = features1_set - features2_set
-                            missing_in_lang1 = features2_set - features1_set
-                            
-                            if missing_in_lang1 or missing_in_lang2:
-                                self.inconsistencies['translation_mismatches'].append({
-                                    'type': 'feature_mismatch_between_languages',
-                                    'url1': url1,
-                                    'url2': url2,
-                                    'language1': lang1,
-                                    'language2': lang2,
-                                    'missing_in_lang1': list(missing_in_lang1),
-                                    'missing_in_lang2': list(missing_in_lang2)
-                                })
+                    self.compare_translation_pair(url1, info1, url2, info2, lang1, lang2)
+    
+    def compare_translation_pair(self, url1, info1, url2, info2, lang1, lang2):
+        """Compare prices and features of two pages believed to be translations"""
+        # Compare prices
+        prices1 = [p.value for p in info1['prices']]
+        prices2 = [p.value for p in info2['prices']]
+        
+        if prices1 and prices2:
+            # Check if price lists are significantly different
+            if not self.price_lists_match(prices1, prices2):
+                self.inconsistencies['translation_mismatches'].append({
+                    'type': 'price_mismatch_between_languages',
+                    'url1': url1,
+                    'url2': url2,
+                    'language1': lang1,
+                    'language2': lang2,
+                    'prices1': prices1,
+                    'prices2': prices2,
+                    'difference': 'Prices differ between language versions'
+                })
+        
+        # Compare package features
+        features1_set = info1['feature_set']
+        features2_set = info2['feature_set']
+        
+        if features1_set and features2_set:
+            # Check feature consistency
+            if features1_set != features2_set:
+                missing_in_lang2 = features1_set - features2_set
+                missing_in_lang1 = features2_set - features1_set
+                
+                if missing_in_lang1 or missing_in_lang2:
+                    self.inconsistencies['translation_mismatches'].append({
+                        'type': 'feature_mismatch_between_languages',
+                        'url1': url1,
+                        'url2': url2,
+                        'language1': lang1,
+                        'language2': lang2,
+                        'missing_in_lang1': list(missing_in_lang1),
+                        'missing_in_lang2': list(missing_in_lang2)
+                    })
+    
+    def canonical_url(self, url: str) -> str:
+        """URL with the /en/ or /si/ language segment removed"""
+        return _canonical_url(url)
     
     def might_be_translations(self, url1, url2, info1, info2):
         """Simple heuristic to check if two pages might be translations"""
         # Check if URLs are similar (same path structure)
-        if url1.replace('/en/', '/').replace('/si/', '/') == url2.replace('/en/', '/').replace('/si/', '/'):
+        if info1['canonical_url'] == info2['canonical_url']:
             return True
         
         # Check if they have similar number of prices (indicating same products)
@@ -477,12 +632,12 @@ class ContentConsistencyAnalyzer:
             return True
         
         # Check if they have similar features
-        features1 = set(f['feature'] for f in info1['package_details']['features'])
-        features2 = set(f['feature'] for f in info2['package_details']['features'])
+        features1 = info1['feature_set']
+        features2 = info2['feature_set']
         
         if features1 and features2:
-            overlap = len(features1.intersection(features2))
-            total = len(features1.union(features2))
+            overlap = len(features1 & features2)
+            total = len(features1 | features2)
             if total > 0 and overlap / total > 0.5:  # More than 50% feature overlap
                 return True
         
@@ -490,29 +645,19 @@ class ContentConsistencyAnalyzer:
     
     def price_lists_match(self, prices1, prices2, tolerance=0.05):
         """Check if two price lists are essentially the same"""
-        if len(prices1) != len(prices2):
-            return False
-        
-        prices1_sorted = sorted(prices1)
-        prices2_sorted = sorted(prices2)
-        
-        for p1, p2 in zip(prices1_sorted, prices2_sorted):
-            if abs(p1 - p2) / max(p1, p2) > tolerance:  # More than 5% difference
-                return False
-        
-        return True
+        return _price_lists_match(prices1, prices2, tolerance)
     
     def check_mixed_language_consistency(self, url, page_info):
         """Check internal consistency within mixed language pages"""
         # This is a simplified check - in practice, you'd need more sophisticated analysis
         prices = page_info['prices']
         
-        english_prices = [p for p in prices if self.detect_language(p['context']) == 'english']
-        sinhala_prices = [p for p in prices if self.detect_language(p['context']) == 'sinhala']
+        english_prices = [p for p in prices if self.detect_language(p.context) == 'english']
+        sinhala_prices = [p for p in prices if self.detect_language(p.context) == 'sinhala']
         
         if english_prices and sinhala_prices:
-            eng_values = [p['value'] for p in english_prices]
-            sin_values = [p['value'] for p in sinhala_prices]
+            eng_values = [p.value for p in english_prices]
+            sin_values = [p.value for p in sinhala_prices]
             
             if not self.price_lists_match(eng_values, sin_values):
                 self.inconsistencies['translation_mismatches'].append({
@@ -529,19 +674,8 @@ class ContentConsistencyAnalyzer:
         
         all_contacts = defaultdict(list)
         
-        for url, page_data in self.data.items():
-            text = page_data.get('text', '')
-            title = page_data.get('title', '')
-            
-            all_text = f"{title} {text}"
-            
-            # Add OCR text
-            for img in page_data.get('ocr_images', []):
-                ocr_text = img.get('text', '')
-                if ocr_text:
-                    all_text += f" {ocr_text}"
-            
-            contact_info = self.extract_contact_info(all_text)
+        for url, page_info in self._preprocess_pages().items():
+            contact_info = page_info['contact_info']
             
             # Group contact info
             for phone in contact_info['phone_numbers']:
@@ -592,155 +726,196 @@ class ContentConsistencyAnalyzer:
     
     def generate_report(self):
         """Generate a focused consistency report"""
+        return "\n".join(self._iter_report_lines())
+    
+    def _iter_report_lines(self):
+        """Yield the lines of the consistency report"""
         stats = self.generate_summary_stats()
-        
-        report = []
-        report.append("=" * 80)
-        report.append("SLT WEBSITE CONTENT CONSISTENCY ANALYSIS")
-        report.append("=" * 80)
-        report.append(f"Generated on: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-        report.append(f"Source file: {self.json_file_path}")
-        report.append(f"Pages analyzed: {stats['total_pages_analyzed']}")
-        report.append(f"Total inconsistencies found: {stats['total_inconsistencies']}")
-        report.append("")
+        pricing_issues = self.inconsistencies['pricing_discrepancies']
+        translation_issues = self.inconsistencies['translation_mismatches']
+        package_issues = self.inconsistencies['package_details_discrepancies']
+        contact_issues = self.inconsistencies['contact_info_discrepancies']
+        
+        yield from (
+            "=" * 80,
+            "SLT WEBSITE CONTENT CONSISTENCY ANALYSIS",
+            "=" * 80,
+            f"Generated on: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}",
+            f"Source file: {self.json_file_path}",
+            f"Pages analyzed: {stats['total_pages_analyzed']}",
+            f"Total inconsistencies found: {stats['total_inconsistencies']}",
+            "",
+        )
         
         # Pricing Discrepancies
-        if self.inconsistencies['pricing_discrepancies']:
-            report.append("🔍 PRICING DISCREPANCIES FOUND")
-            report.append("=" * 50)
-            for i, issue in enumerate(self.inconsistencies['pricing_discrepancies'], 1):
-                report.append(f"\n{i}. {issue['category'].upper()} PRICING INCONSISTENCY")
-                report.append(f"   Price Range: {issue['price_range']}")
-                report.append(f"   Difference: {issue['difference_percentage']}")
-                report.append("   Found in:")
+        if pricing_issues:
+            yield from (
+                "🔍 PRICING DISCREPANCIES FOUND",
+                "=" * 50,
+            )
+            for i, issue in enumerate(pricing_issues, 1):
+                yield from (
+                    f"\n{i}. {issue['category'].upper()} PRICING INCONSISTENCY",
+                    f"   Price Range: {issue['price_range']}",
+                    f"   Difference: {issue['difference_percentage']}",
+                    "   Found in:",
+                )
                 
                 for occ in issue['occurrences']:
-                    report.append(f"   • {occ['url']}")
-                    report.append(f"     Price: {occ['price']} ({occ['language']} content)")
-                    report.append(f"     Context: {occ['context'][:100]}...")
-                    report.append("")
+                    yield from (
+                        f"   • {occ['url']}",
+                        f"     Price: {occ['price']} ({occ['language']} content)",
+                        f"     Context: {occ['context'][:100]}...",
+                        "",
+                    )
         else:
-            report.append("✅ NO PRICING DISCREPANCIES FOUND")
-            report.append("")
+            yield from (
+                "✅ NO PRICING DISCREPANCIES FOUND",
+                "",
+            )
         
         # Translation Mismatches
-        if self.inconsistencies['translation_mismatches']:
-            report.append("🔍 ENGLISH-SINHALA TRANSLATION MISMATCHES")
-            report.append("=" * 50)
-            for i, issue in enumerate(self.inconsistencies['translation_mismatches'], 1):
-                report.append(f"\n{i}. {issue['type'].upper()}")
+        if translation_issues:
+            yield from (
+                "🔍 ENGLISH-SINHALA TRANSLATION MISMATCHES",
+                "=" * 50,
+            )
+            for i, issue in enumerate(translation_issues, 1):
+                yield f"\n{i}. {issue['type'].upper()}"
                 
                 if issue['type'] == 'price_mismatch_between_languages':
-                    report.append(f"   {issue['language1'].title()} page: {issue['url1']}")
-                    report.append(f"   {issue['language1'].title()} prices: {issue['prices1']}")
-                    report.append(f"   {issue['language2'].title()} page: {issue['url2']}")
-                    report.append(f"   {issue['language2'].title()} prices: {issue['prices2']}")
+                    yield from (
+                        f"   {issue['language1'].title()} page: {issue['url1']}",
+                        f"   {issue['language1'].title()} prices: {issue['prices1']}",
+                        f"   {issue['language2'].title()} page: {issue['url2']}",
+                        f"   {issue['language2'].title()} prices: {issue['prices2']}",
+                    )
                 
                 elif issue['type'] == 'feature_mismatch_between_languages':
-                    report.append(f"   {issue['language1'].title()} page: {issue['url1']}")
-                    report.append(f"   {issue['language2'].title()} page: {issue['url2']}")
+                    yield from (
+                        f"   {issue['language1'].title()} page: {issue['url1']}",
+                        f"   {issue['language2'].title()} page: {issue['url2']}",
+                    )
                     if issue.get('missing_in_lang1'):
-                        report.append(f"   Missing in {issue['language1'].title()}: {issue.get('missing_in_lang1')}")
+                        yield f"   Missing in {issue['language1'].title()}: {issue.get('missing_in_lang1')}"
                     if issue.get('missing_in_lang2'):
-                        report.append(f"   Missing in {issue['language2'].title()}: {issue.get('missing_in_lang2')}")
+                        yield f"   Missing in {issue['language2'].title()}: {issue.get('missing_in_lang2')}"
                 
                 elif issue['type'] == 'internal_language_price_mismatch':
-                    report.append(f"   Page: {issue['url']}")
-                    report.append(f"   English prices: {issue['english_prices']}")
-                    report.append(f"   Sinhala prices: {issue['sinhala_prices']}")
-                    report.append(f"   Issue: {issue['issue']}")
+                    yield from (
+                        f"   Page: {issue['url']}",
+                        f"   English prices: {issue['english_prices']}",
+                        f"   Sinhala prices: {issue['sinhala_prices']}",
+                        f"   Issue: {issue['issue']}",
+                    )
                 
-                report.append("")
+                yield ""
         else:
-            report.append("✅ NO TRANSLATION MISMATCHES FOUND")
-            report.append("")
+            yield from (
+                "✅ NO TRANSLATION MISMATCHES FOUND",
+                "",
+            )
         
         # Package Details Discrepancies
-        if self.inconsistencies['package_details_discrepancies']:
-            report.append("🔍 PACKAGE DETAILS DISCREPANCIES")
-            report.append("=" * 50)
-            for i, issue in enumerate(self.inconsistencies['package_details_discrepancies'], 1):
-                report.append(f"\n{i}. {issue['type'].upper()}")
-                report.append(f"   Feature Group: {issue.get('feature_group', '')}")
+        if package_issues:
+            yield from (
+                "🔍 PACKAGE DETAILS DISCREPANCIES",
+                "=" * 50,
+            )
+            for i, issue in enumerate(package_issues, 1):
+                yield from (
+                    f"\n{i}. {issue['type'].upper()}",
+                    f"   Feature Group: {issue.get('feature_group', '')}",
+                )
                 
                 if 'speed_variations' in issue:
-                    report.append(f"   Speed variations: {issue['speed_variations']}")
+                    yield f"   Speed variations: {issue['speed_variations']}"
                 if 'data_variations' in issue:
-                    report.append(f"   Data limit variations: {issue['data_variations']}")
+                    yield f"   Data limit variations: {issue['data_variations']}"
                 
-                report.append("   Found in packages:")
+                yield "   Found in packages:"
                 for pkg in issue.get('packages', []):
                     speeds = [s.get('value') for s in pkg.get('speeds', [])]
                     data_limits = [
                         (d.get('type') if 'type' in d else d.get('value')) for d in pkg.get('data_limits', [])
                     ]
-                    report.append(f"   • {pkg.get('url')} - speeds: {speeds}, data_limits: {data_limits}, language: {pkg.get('language')}")
+                    yield f"   • {pkg.get('url')} - speeds: {speeds}, data_limits: {data_limits}, language: {pkg.get('language')}"
                 
-                report.append("")
+                yield ""
         else:
-            report.append("✅ NO PACKAGE DETAILS DISCREPANCIES FOUND")
-            report.append("")
+            yield from (
+                "✅ NO PACKAGE DETAILS DISCREPANCIES FOUND",
+                "",
+            )
         
         # Contact Info Discrepancies
-        if self.inconsistencies['contact_info_discrepancies']:
-            report.append("🔍 CONTACT INFORMATION DISCREPANCIES")
-            report.append("=" * 50)
-            for i, issue in enumerate(self.inconsistencies['contact_info_discrepancies'], 1):
-                report.append(f"\n{i}. {issue.get('type', 'unknown').upper()}")
-                report.append(f"   Count: {issue.get('count', '')}")
+        if contact_issues:
+            yield from (
+                "🔍 CONTACT INFORMATION DISCREPANCIES",
+                "=" * 50,
+            )
+            for i, issue in enumerate(contact_issues, 1):
+                yield from (
+                    f"\n{i}. {issue.get('type', 'unknown').upper()}",
+                    f"   Count: {issue.get('count', '')}",
+                )
                 if 'numbers' in issue:
-                    report.append(f"   Numbers: {issue['numbers']}")
+                    yield f"   Numbers: {issue['numbers']}"
                 if 'emails' in issue:
-                    report.append(f"   Emails: {issue['emails']}")
-                report.append("   Details:")
-                for d in issue.get('details', []):
-                    report.append(f"   • {d.get('url')} - {d.get('number') or d.get('email')} (context: {d.get('context','')[:80]})")
-                report.append("")
+                    yield f"   Emails: {issue['emails']}"
+                yield "   Details:"
+                yield from (f"   • {d.get('url')} - {d.get('number') or d.get('email')} (context: {d.get('context','')[:80]})"
+                            for d in issue.get('details', []))
+                yield ""
         else:
-            report.append("✅ NO CONTACT INFORMATION DISCREPANCIES FOUND")
-            report.append("")
+            yield from (
+                "✅ NO CONTACT INFORMATION DISCREPANCIES FOUND",
+                "",
+            )
         
         # Summary and Recommendations
-        report.append("📋 SUMMARY & RECOMMENDATIONS")
-        report.append("=" * 50)
+        yield from (
+            "📋 SUMMARY & RECOMMENDATIONS",
+            "=" * 50,
+        )
         
         total_issues = stats['total_inconsistencies']
         if total_issues == 0:
-            report.append("🎉 EXCELLENT! No content inconsistencies found.")
-            report.append("Your website content is consistent across all pages and languages.")
+            yield from (
+                "🎉 EXCELLENT! No content inconsistencies found.",
+                "Your website content is consistent across all pages and languages.",
+            )
         else:
-            report.append(f"⚠️  FOUND {total_issues} CONTENT INCONSISTENCIES")
-            report.append("")
-            report.append("PRIORITY ACTIONS NEEDED:")
-            
-            pricing_issues = len(self.inconsistencies['pricing_discrepancies'])
-            translation_issues = len(self.inconsistencies['translation_mismatches'])
-            package_issues = len(self.inconsistencies['package_details_discrepancies'])
-            contact_issues = len(self.inconsistencies['contact_info_discrepancies'])
+            yield from (
+                f"⚠️  FOUND {total_issues} CONTENT INCONSISTENCIES",
+                "",
+                "PRIORITY ACTIONS NEEDED:",
+            )
             
             if pricing_issues:
-                report.append(f" - Fix pricing inconsistencies ({pricing_issues} issues)")
+                yield f" - Fix pricing inconsistencies ({len(pricing_issues)} issues)"
             if translation_issues:
-                report.append(f" - Review translation mismatches ({translation_issues} issues)")
+                yield f" - Review translation mismatches ({len(translation_issues)} issues)"
             if package_issues:
-                report.append(f" - Harmonize package details ({package_issues} issues)")
+                yield f" - Harmonize package details ({len(package_issues)} issues)"
             if contact_issues:
-                report.append(f" - Consolidate contact information ({contact_issues} issues)")
-        
-        # Return full report text
-        report_text = "\n".join(report)
-        return report_text
+                yield f" - Consolidate contact information ({len(contact_issues)} issues)"
+
     def save_report(self, filename: str = None):
         """Save generated report to a file (and optionally print)"""
-        report_text = self.generate_report()
+        lines = self._iter_report_lines()
         if filename is None:
             filename = f"consistency_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.txt"
         try:
-            with open(filename, 'w', encoding='utf-8') as f:
-                f.write(report_text)
+            # Write line by line so the full report text is never built in memory, into
+            # a temporary file so a failure part way never leaves a truncated report
+            with _atomic_open(filename, 'w', encoding='utf-8') as f:
+                f.write(next(lines, ''))
+                f.writelines('\n' + line for line in lines)
             self.logger.info(f"Report saved to {filename}")
         except Exception as e:
             self.logger.error(f"Failed to save report: {e}")
+            return None
         return filename
 
     def generate_summary_stats(self):
@@ -763,6 +938,8 @@ def main():
     """Main function to run the content consistency analyzer"""
     import sys
     
+    logging.basicConfig(level=logging.INFO)
+    
     if len(sys.argv) != 2:
         print("Usage: python content_consistency_analyzer.py <Scrapped.json>")
         print("Example: python content_consistency_analyzer.py Scrapped.json")
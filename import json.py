@@ -1,16 +1,265 @@
+import io
 import json
+import os
 import re
 from difflib import SequenceMatcher
-from collections import defaultdict, Counter
+from collections import defaultdict
 import logging
 from datetime import datetime
+from urllib.parse import urlparse
 from typing import Dict, List, Tuple, Any
+from contextlib import contextmanager, suppress
+from functools import lru_cache
+from itertools import islice
 import unicodedata
 
+try:
+    import orjson
+except ImportError:  # optional, falls back to the standard json module
+    orjson = None
+
+# Display names of the discrepancy categories
+_CATEGORY_LABELS = {
+    'english_content': 'English Content',
+    'english_sinhala': 'English Sinhala',
+    'sinhala_sinhala': 'Sinhala Sinhala',
+    'banner_text': 'Banner Text',
+    'missing_translations': 'Missing Translations',
+    'inconsistent_terminology': 'Inconsistent Terminology',
+    'formatting_issues': 'Formatting Issues'
+}
+
+# Report separators
+_RULE80 = "=" * 80
+_SEP80 = _RULE80 + "\n"
+_SEP40 = "-" * 40 + "\n"
+_SEP50 = "-" * 50 + "\n"
+
+# Language segment of a URL path, e.g. /en/ or a trailing /si
+_LANG_SEGMENT_RE = re.compile(r'/(?:en|si|ta)(?=/|$)')
+
+# Every byte value except ASCII letters, for bytes.translate(None, ...)
+_NON_ASCII_ALPHA = bytes(b for b in range(256) if not (0x41 <= b <= 0x5A or 0x61 <= b <= 0x7A))
+
+@lru_cache(maxsize=100_000)
+def _detect_language(text: str) -> str:
+    """Detect language of text"""
+    if not text:
+        return "unknown"
+    
+    total_chars = len(text.replace(' ', ''))
+    
+    if total_chars == 0:
+        return "unknown"
+    
+    # Pure ASCII text (most banner OCR) has no Sinhala, so only the letter ratio matters
+    if text.isascii():
+        english_chars = len(text.encode('ascii').translate(None, _NON_ASCII_ALPHA))
+        return "english" if english_chars / total_chars > 0.5 else "mixed"
+    
+    # Sinhala characters (0D80-0DFF) all start with E0 B6 or E0 B7 in UTF-8
+    encoded = text.encode('utf-8', 'surrogatepass')
+    sinhala_chars = encoded.count(b'\xe0\xb6') + encoded.count(b'\xe0\xb7')
+    english_chars = len(text.encode('ascii', 'ignore').translate(None, _NON_ASCII_ALPHA))
+    
+    sinhala_ratio = sinhala_chars / total_chars
+    english_ratio = english_chars / total_chars
+    
+    if sinhala_ratio > 0.1:
+        return "sinhala" if sinhala_ratio > english_ratio else "mixed"
+    elif english_ratio > 0.5:
+        return "english"
+    else:
+        return "mixed"
+
+def _translation_key(url: str) -> str:
+    """URL path with the language segment removed, shared by a page and its translations"""
+    return _LANG_SEGMENT_RE.sub('', urlparse(url).path).rstrip('/')
+
+def _item_text(item: Dict) -> str:
+    """Text of a heading or link entry"""
+    return item.get('text', '')
+
+def _filter_by_language(items: List, langs: List, target: str, getter=None) -> List:
+    """Items whose detected language is target, optionally mapped through getter"""
+    if getter is None:
+        return [item for item, lang in zip(items, langs) if lang == target]
+    return [getter(item) for item, lang in zip(items, langs) if lang == target]
+
+@lru_cache(maxsize=100_000)
+def _normalize_text(text: str) -> str:
+    """Normalize text for comparison"""
+    if not text:
+        return ""
+    
+    # Remove extra whitespace
+    text = ' '.join(text.split())
+    
+    # Normalize Unicode characters (ASCII text is already in NFKC form)
+    if not text.isascii():
+        text = unicodedata.normalize('NFKC', text)
+    
+    # Convert to lowercase for comparison
+    text = text.lower()
+    
+    return text
+
+@lru_cache(maxsize=100_000)
+def _similarity_ratio(norm1: str, norm2: str) -> float:
+    """SequenceMatcher ratio of two normalized texts"""
+    if not norm1 and not norm2:
+        return 1.0
+    if not norm1 or not norm2:
+        return 0.0
+    
+    return SequenceMatcher(None, norm1, norm2).ratio()
+
+def _similarity_exceeds(norm1: str, norm2: str, threshold: float) -> bool:
+    """Whether the ratio of two normalized texts is above threshold"""
+    if norm1 and norm2:
+        # Cheap upper bounds on ratio() rule most pairs out without the full match
+        matcher = SequenceMatcher(None, norm1, norm2)
+        if matcher.real_quick_ratio() <= threshold or matcher.quick_ratio() <= threshold:
+            return False
+    return _similarity_ratio(norm1, norm2) > threshold
+
+# Sections with a per-item language list under a page's 'languages'
+_LANGUAGE_SECTIONS = ('headings', 'paragraphs', 'links', 'buttons')
+
+# Sections compared between pages that are translations of each other
+_COMPARED_SECTIONS = ('title', 'headings', 'paragraphs')
+
+def _section_texts(eng: Dict, sin: Dict) -> Dict[str, Tuple[str, str]]:
+    """Normalized (English, Sinhala) text of each compared section present in both languages"""
+    texts = {}
+    for section in _COMPARED_SECTIONS:
+        eng_content = eng.get(section, [])
+        sin_content = sin.get(section, [])
+        if eng_content and sin_content:
+            texts[section] = (_normalize_text(str(eng_content)), _normalize_text(str(sin_content)))
+    return texts
+
+def _format_term_issue(i: int, issue: Dict) -> str:
+    """Report block for an inconsistent English term"""
+    return (f"Issue {i}: {issue['type']}\n"
+            f"Term: {issue['term']}\n"
+            f"Variations found: {', '.join(issue['variations'])}\n"
+            f"Occurrences: {len(issue['occurrences'])}\n"
+            "\n")
+
+def _format_translation_issue(i: int, issue: Dict) -> str:
+    """Report block for a translation inconsistency"""
+    return (f"Issue {i}: {issue['type']}\n"
+            f"Pages: {issue['page1']} vs {issue['page2']}\n"
+            f"English similarity: {issue['english_similarity']:.2f}\n"
+            f"Sinhala similarity: {issue['sinhala_similarity']:.2f}\n"
+            "\n")
+
+def _format_sinhala_term_issue(i: int, issue: Dict) -> str:
+    """Report block for an inconsistent Sinhala term"""
+    # Sinhala variations are counted rather than listed
+    return (f"Issue {i}: {issue['type']}\n"
+            f"Term: {issue['term']}\n"
+            f"Variations found: {len(issue['variations'])}\n"
+            f"Occurrences: {len(issue['occurrences'])}\n"
+            "\n")
+
+def _format_banner_issue(i: int, issue: Dict) -> str:
+    """Report block for inconsistent banner text"""
+    return (f"Issue {i}: {issue['type']}\n"
+            f"Variations: {', '.join(issue['variations'])}\n"
+            f"Found in {len(issue['occurrences'])} banners\n"
+            "\n")
+
+def _format_missing_translation(i: int, issue: Dict) -> str:
+    """Report block for a page missing its translation"""
+    return (f"Issue {i}: {issue['type']}\n"
+            f"URL: {issue['url']}\n"
+            "\n")
+
+def _format_terminology_issue(i: int, issue: Dict) -> str:
+    """Report block for inconsistent terminology"""
+    return (f"Issue {i}: Base term '{issue['base_term']}'\n"
+            f"Variations: {', '.join(issue['variations'])}\n"
+            f"Total occurrences: {len(issue['occurrences'])}\n"
+            "\n")
+
+def _format_formatting_issue(i: int, issue: Dict) -> str:
+    """Report block for a formatting issue"""
+    if 'empty_sections' in issue:
+        detail = f"Empty sections: {', '.join(issue['empty_sections'])}\n"
+    elif 'length' in issue:
+        detail = f"Paragraph length: {issue['length']} characters\n"
+    else:
+        detail = ""
+    return (f"Issue {i}: {issue['type']}\n"
+            f"URL: {issue['url']}\n"
+            f"{detail}"
+            "\n")
+
+# Detailed report sections: discrepancy key, heading and per-issue formatter
+_REPORT_SECTIONS = (
+    ('english_content', "1. ENGLISH CONTENT DISCREPANCIES\n", _format_term_issue),
+    ('english_sinhala', "2. ENGLISH-SINHALA TRANSLATION DISCREPANCIES\n", _format_translation_issue),
+    ('sinhala_sinhala', "3. SINHALA CONTENT DISCREPANCIES\n", _format_sinhala_term_issue),
+    ('banner_text', "4. BANNER TEXT DISCREPANCIES\n", _format_banner_issue),
+    ('missing_translations', "5. MISSING TRANSLATIONS\n", _format_missing_translation),
+    ('inconsistent_terminology', "6. INCONSISTENT TERMINOLOGY\n", _format_terminology_issue),
+    ('formatting_issues', "7. FORMATTING ISSUES\n", _format_formatting_issue),
+)
+
+# Recommendation lines, written for each category with at least one discrepancy
+_RECOMMENDATIONS = (
+    ('english_content', "• Establish a style guide for consistent English terminology\n"),
+    ('english_sinhala', "• Review translation processes to ensure consistency\n"),
+    ('sinhala_sinhala', "• Standardize Sinhala terminology across all pages\n"),
+    ('banner_text', "• Create consistent banner templates and text standards\n"),
+    ('missing_translations', "• Complete missing translations for bilingual consistency\n"),
+    ('formatting_issues', "• Review content structure and formatting guidelines\n"),
+)
+
+@contextmanager
+def _atomic_open(path: str, mode: str = 'wb', **kwargs):
+    """Open a temporary file that replaces path only once it has been fully written"""
+    tmp_path = f"{path}.tmp"
+    try:
+        with open(tmp_path, mode, **kwargs) as f:
+            yield f
+    except BaseException:
+        with suppress(OSError):
+            os.remove(tmp_path)
+        raise
+    os.replace(tmp_path, path)
+
+def _json_default(obj: Any) -> str:
+    """Encode values the json module can't, matching how orjson writes datetimes"""
+    if isinstance(obj, datetime):
+        return obj.isoformat()
+    return str(obj)
+
+def _write_orjson_streamed(f, header: Dict, key: str, entries: Dict):
+    """Write header plus entries under key as indented JSON, encoding one entry at a time"""
+    option = orjson.OPT_INDENT_2
+    # Reopen the encoded header by dropping its closing "\n}"
+    f.write(orjson.dumps(header, option=option, default=str)[:-2])
+    f.write(b',\n  ' + orjson.dumps(key) + b': {')
+    sep = b'\n    '
+    for name, value in entries.items():
+        f.write(sep + orjson.dumps(name) + b': ')
+        # Entries sit two levels deep, so shift every encoded line right by four spaces
+        f.write(orjson.dumps(value, option=option, default=str).replace(b'\n', b'\n    '))
+        sep = b',\n    '
+    f.write(b'\n  }\n}' if entries else b'}\n}')
+
 class DiscrepancyAnalyzer:
+    # Common terms that should be consistent
+    common_terms = ('internet', 'broadband', 'package', 'plan', 'service', 'customer',
+                    'support', 'contact', 'home', 'business', 'mobile', 'fiber')
+    
     def __init__(self, json_file_path: str):
         self.json_file_path = json_file_path
         self.data = None
+        self._pages = []
         self.discrepancies = {
             'english_content': [],
             'english_sinhala': [],
@@ -21,6 +270,16 @@ class DiscrepancyAnalyzer:
             'formatting_issues': []
         }
         
+        # Words containing any common term, found in a single scan
+        self._term_re = re.compile(r'\b\w*(?:' + '|'.join(self.common_terms) + r')\w*\b')
+        
+        # Term maps shared by the English and Sinhala content checks
+        self._english_terms = None
+        self._sinhala_terms = None
+        
+        # Page, banner and image totals, fixed once the data is loaded
+        self._page_totals = None
+        
         # Setup logging
         logging.basicConfig(level=logging.INFO)
         self.logger = logging.getLogger(__name__)
@@ -32,213 +291,154 @@ class DiscrepancyAnalyzer:
         try:
             with open(self.json_file_path, 'r', encoding='utf-8') as f:
                 self.data = json.load(f)
+            self._pages = self.data.get('pages', [])
+            self._page_totals = None
+            self._normalize_pages()
             self.logger.info(f"Loaded data from {self.json_file_path}")
         except Exception as e:
             self.logger.error(f"Error loading data: {e}")
             raise
     
+    def _normalize_pages(self):
+        """Fill in missing page fields once so the analyses can index them directly"""
+        # text_content sections are left alone: the formatting check reports on the ones present
+        for page in self._pages:
+            page.setdefault('url', '')
+            page.setdefault('text_content', {})
+            page.setdefault('total_banners', 0)
+            page.setdefault('total_images', 0)
+            
+            languages = page.setdefault('languages', {})
+            for section in _LANGUAGE_SECTIONS:
+                languages.setdefault(section, [])
+            
+            for banner in page.setdefault('banner_data', []):
+                banner.setdefault('ocr_text', '')
+                banner.setdefault('is_banner', False)
+                banner.setdefault('src', '')
+    
+    def _iter_pages(self):
+        """Yield (url, text_content, languages, banner_data) for each page"""
+        for page in self._pages:
+            yield page['url'], page['text_content'], page['languages'], page['banner_data']
+    
     def normalize_text(self, text: str) -> str:
         """Normalize text for comparison"""
-        if not text:
-            return ""
-        
-        # Remove extra whitespace
-        text = ' '.join(text.split())
-        
-        # Normalize Unicode characters
-        text = unicodedata.normalize('NFKC', text)
-        
-        # Convert to lowercase for comparison
-        text = text.lower()
-        
-        return text
+        return _normalize_text(text)
     
     def similarity_score(self, text1: str, text2: str) -> float:
         """Calculate similarity between two texts"""
-        norm1 = self.normalize_text(text1)
-        norm2 = self.normalize_text(text2)
-        
-        if not norm1 and not norm2:
-            return 1.0
-        if not norm1 or not norm2:
-            return 0.0
+        # SequenceMatcher is not symmetric, so the pair is cached in order
+        return _similarity_ratio(_normalize_text(text1), _normalize_text(text2))
+    
+    def similarity_exceeds(self, text1: str, text2: str, threshold: float) -> bool:
+        """Check whether two texts are more similar than threshold"""
+        return _similarity_exceeds(_normalize_text(text1), _normalize_text(text2), threshold)
+    
+    def _extract_by_language(self, page_data: Dict, lang: str) -> Dict[str, str]:
+        """Extract all text in the given language from a page"""
+        # Extract text content based on language detection
+        text_content = page_data['text_content']
+        languages = page_data['languages']
         
-        return SequenceMatcher(None, norm1, norm2).ratio()
+        return {
+            'title': text_content.get('title', '') if languages.get('title') == lang else '',
+            'headings': _filter_by_language(
+                text_content.get('headings', []), languages['headings'], lang, _item_text),
+            'paragraphs': _filter_by_language(
+                text_content.get('paragraphs', []), languages['paragraphs'], lang),
+            'links': _filter_by_language(
+                text_content.get('links', []), languages['links'], lang, _item_text),
+            'buttons': _filter_by_language(
+                text_content.get('buttons', []), languages['buttons'], lang),
+            'banner_ocr': [
+                ocr_text for ocr_text in (banner['ocr_text'] for banner in page_data['banner_data'])
+                if self.detect_language(ocr_text) == lang
+            ]
+        }
     
     def extract_english_text(self, page_data: Dict) -> Dict[str, str]:
         """Extract all English text from a page"""
-        english_content = {
-            'title': '',
-            'headings': [],
-            'paragraphs': [],
-            'links': [],
-            'buttons': [],
-            'banner_ocr': []
-        }
-        
-        # Extract text content based on language detection
-        text_content = page_data.get('text_content', {})
-        languages = page_data.get('languages', {})
-        
-        # Title
-        if languages.get('title') == 'english':
-            english_content['title'] = text_content.get('title', '')
-        
-        # Headings
-        headings = text_content.get('headings', [])
-        heading_langs = languages.get('headings', [])
-        for i, heading in enumerate(headings):
-            if i < len(heading_langs) and heading_langs[i] == 'english':
-                english_content['headings'].append(heading.get('text', ''))
-        
-        # Paragraphs
-        paragraphs = text_content.get('paragraphs', [])
-        para_langs = languages.get('paragraphs', [])
-        for i, para in enumerate(paragraphs):
-            if i < len(para_langs) and para_langs[i] == 'english':
-                english_content['paragraphs'].append(para)
-        
-        # Links
-        links = text_content.get('links', [])
-        link_langs = languages.get('links', [])
-        for i, link in enumerate(links):
-            if i < len(link_langs) and link_langs[i] == 'english':
-                english_content['links'].append(link.get('text', ''))
-        
-        # Buttons
-        buttons = text_content.get('buttons', [])
-        button_langs = languages.get('buttons', [])
-        for i, button in enumerate(buttons):
-            if i < len(button_langs) and button_langs[i] == 'english':
-                english_content['buttons'].append(button)
-        
-        # Banner OCR text (English)
-        for banner in page_data.get('banner_data', []):
-            ocr_text = banner.get('ocr_text', '')
-            if self.detect_language(ocr_text) == 'english':
-                english_content['banner_ocr'].append(ocr_text)
-        
-        return english_content
+        return self._extract_by_language(page_data, 'english')
     
     def extract_sinhala_text(self, page_data: Dict) -> Dict[str, str]:
         """Extract all Sinhala text from a page"""
-        sinhala_content = {
-            'title': '',
-            'headings': [],
-            'paragraphs': [],
-            'links': [],
-            'buttons': [],
-            'banner_ocr': []
-        }
-        
-        text_content = page_data.get('text_content', {})
-        languages = page_data.get('languages', {})
-        
-        # Title
-        if languages.get('title') == 'sinhala':
-            sinhala_content['title'] = text_content.get('title', '')
-        
-        # Headings
-        headings = text_content.get('headings', [])
-        heading_langs = languages.get('headings', [])
-        for i, heading in enumerate(headings):
-            if i < len(heading_langs) and heading_langs[i] == 'sinhala':
-                sinhala_content['headings'].append(heading.get('text', ''))
-        
-        # Paragraphs
-        paragraphs = text_content.get('paragraphs', [])
-        para_langs = languages.get('paragraphs', [])
-        for i, para in enumerate(paragraphs):
-            if i < len(para_langs) and para_langs[i] == 'sinhala':
-                sinhala_content['paragraphs'].append(para)
-        
-        # Links
-        links = text_content.get('links', [])
-        link_langs = languages.get('links', [])
-        for i, link in enumerate(links):
-            if i < len(link_langs) and link_langs[i] == 'sinhala':
-                sinhala_content['links'].append(link.get('text', ''))
-        
-        # Buttons
-        buttons = text_content.get('buttons', [])
-        button_langs = languages.get('buttons', [])
-        for i, button in enumerate(buttons):
-            if i < len(button_langs) and button_langs[i] == 'sinhala':
-                sinhala_content['buttons'].append(button)
-        
-        # Banner OCR text (Sinhala)
-        for banner in page_data.get('banner_data', []):
-            ocr_text = banner.get('ocr_text', '')
-            if self.detect_language(ocr_text) == 'sinhala':
-                sinhala_content['banner_ocr'].append(ocr_text)
-        
-        return sinhala_content
+        return self._extract_by_language(page_data, 'sinhala')
     
     def detect_language(self, text: str) -> str:
         """Detect language of text"""
-        if not text:
-            return "unknown"
-        
-        sinhala_chars = sum(1 for char in text if '\u0D80' <= char <= '\u0DFF')
-        english_chars = sum(1 for char in text if char.isalpha() and char.isascii())
-        
-        total_chars = len(text.replace(' ', ''))
-        
-        if total_chars == 0:
-            return "unknown"
-        
-        sinhala_ratio = sinhala_chars / total_chars
-        english_ratio = english_chars / total_chars
-        
-        if sinhala_ratio > 0.1:
-            return "sinhala" if sinhala_ratio > english_ratio else "mixed"
-        elif english_ratio > 0.5:
-            return "english"
-        else:
-            return "mixed"
+        return _detect_language(text)
+    
+    def _collect_terms(self):
+        """Collect English and Sinhala terms across pages in a single pass"""
+        if self._english_terms is not None:
+            return
+        
+        # term -> surface text -> {(url, section)}, so each term's variations are its keys
+        english_terms = defaultdict(lambda: defaultdict(set))
+        sinhala_terms = defaultdict(lambda: defaultdict(set))
+        norm = self.normalize_text
+        
+        for page in self._pages:
+            url = page['url']
+            
+            # English terms are keyed on their stripped, lowercased text
+            for section, content in self.extract_english_text(page).items():
+                items = content if isinstance(content, list) else (content,)
+                for item in items:
+                    key = item.strip().lower()
+                    if key:
+                        english_terms[key][item].add((url, section))
+            
+            # Sinhala terms are keyed on their normalized text
+            for section, content in self.extract_sinhala_text(page).items():
+                items = content if isinstance(content, list) else (content,)
+                for item in items:
+                    if item.strip():
+                        sinhala_terms[norm(item)][item].add((url, section))
+        
+        self._english_terms = english_terms
+        self._sinhala_terms = sinhala_terms
     
     def find_english_content_discrepancies(self):
         """Find discrepancies within English content across pages"""
         self.logger.info("Analyzing English content discrepancies...")
         
-        english_terms = defaultdict(set)
-        
-        # Collect all English terms across pages
-        for page in self.data.get('pages', []):
-            english_content = self.extract_english_text(page)
-            url = page.get('url', '')
-            
-            for section, content in english_content.items():
-                if isinstance(content, list):
-                    for item in content:
-                        if item.strip():
-                            english_terms[item.strip().lower()].add((url, section, item))
-                elif content.strip():
-                    english_terms[content.strip().lower()].add((url, section, content))
+        self._collect_terms()
+        english_terms = self._english_terms
         
         # Find terms that appear with variations
-        for term_key, occurrences in english_terms.items():
-            if len(occurrences) > 1:
-                # Check if all occurrences are identical
-                unique_texts = set(occ[2] for occ in occurrences)
-                if len(unique_texts) > 1:
-                    self.discrepancies['english_content'].append({
-                        'type': 'inconsistent_english_term',
-                        'term': term_key,
-                        'variations': list(unique_texts),
-                        'occurrences': [{'url': occ[0], 'section': occ[1], 'text': occ[2]} 
-                                      for occ in occurrences]
-                    })
+        for term_key, texts in english_terms.items():
+            if len(texts) > 1:
+                self.discrepancies['english_content'].append({
+                    'type': 'inconsistent_english_term',
+                    'term': term_key,
+                    'variations': list(texts),
+                    'occurrences': [{'url': url, 'section': section, 'text': text}
+                                  for text, locations in texts.items() for url, section in locations]
+                })
     
     def find_translation_discrepancies(self):
         """Find discrepancies between English and Sinhala content"""
         self.logger.info("Analyzing English-Sinhala translation discrepancies...")
         
-        pages = self.data.get('pages', [])
+        pages = self._pages
+        
+        # Extract each page's content once instead of once per comparison
+        extracted = [(self.extract_english_text(page), self.extract_sinhala_text(page)) for page in pages]
+        
+        # Only pages that are the same document in another language are paired up
+        keys = [_translation_key(page['url']) for page in pages]
+        buckets = defaultdict(list)
+        for i, key in enumerate(keys):
+            buckets[key].append(i)
+        
+        # Section texts are built once for each page that has a partner to compare with
+        section_texts = [_section_texts(*extracted[i]) if len(buckets[key]) > 1 else None
+                         for i, key in enumerate(keys)]
         
         for i, page1 in enumerate(pages):
-            english_content1 = self.extract_english_text(page1)
-            sinhala_content1 = self.extract_sinhala_text(page1)
+            english_content1, sinhala_content1 = extracted[i]
             
             # Check if page has both English and Sinhala content
             has_english = any(content for content in english_content1.values() if content)
@@ -247,59 +447,44 @@ class DiscrepancyAnalyzer:
             if has_english and not has_sinhala:
                 self.discrepancies['missing_translations'].append({
                     'type': 'missing_sinhala_translation',
-                    'url': page1.get('url'),
+                    'url': page1['url'],
                     'english_content': english_content1
                 })
             elif has_sinhala and not has_english:
                 self.discrepancies['missing_translations'].append({
                     'type': 'missing_english_translation',
-                    'url': page1.get('url'),
+                    'url': page1['url'],
                     'sinhala_content': sinhala_content1
                 })
             
             # Compare similar pages for translation consistency
-            for j, page2 in enumerate(pages[i+1:], i+1):
-                if self.pages_are_similar(page1, page2):
-                    english_content2 = self.extract_english_text(page2)
-                    sinhala_content2 = self.extract_sinhala_text(page2)
+            for j in buckets[keys[i]]:
+                page2 = pages[j]
+                if j > i and self.pages_are_similar(page1, page2):
+                    english_content2, sinhala_content2 = extracted[j]
                     
                     # Check for translation discrepancies
                     self.compare_translations(page1, page2, english_content1, 
-                                           sinhala_content1, english_content2, sinhala_content2)
+                                           sinhala_content1, english_content2, sinhala_content2,
+                                           section_texts[i], section_texts[j])
     
     def find_sinhala_content_discrepancies(self):
         """Find discrepancies within Sinhala content across pages"""
         self.logger.info("Analyzing Sinhala content discrepancies...")
         
-        sinhala_terms = defaultdict(set)
-        
-        # Collect all Sinhala terms across pages
-        for page in self.data.get('pages', []):
-            sinhala_content = self.extract_sinhala_text(page)
-            url = page.get('url', '')
-            
-            for section, content in sinhala_content.items():
-                if isinstance(content, list):
-                    for item in content:
-                        if item.strip():
-                            normalized = self.normalize_text(item)
-                            sinhala_terms[normalized].add((url, section, item))
-                elif content.strip():
-                    normalized = self.normalize_text(content)
-                    sinhala_terms[normalized].add((url, section, content))
+        self._collect_terms()
+        sinhala_terms = self._sinhala_terms
         
         # Find terms that appear with variations
-        for term_key, occurrences in sinhala_terms.items():
-            if len(occurrences) > 1:
-                unique_texts = set(occ[2] for occ in occurrences)
-                if len(unique_texts) > 1:
-                    self.discrepancies['sinhala_sinhala'].append({
-                        'type': 'inconsistent_sinhala_term',
-                        'term': term_key,
-                        'variations': list(unique_texts),
-                        'occurrences': [{'url': occ[0], 'section': occ[1], 'text': occ[2]} 
-                                      for occ in occurrences]
-                    })
+        for term_key, texts in sinhala_terms.items():
+            if len(texts) > 1:
+                self.discrepancies['sinhala_sinhala'].append({
+                    'type': 'inconsistent_sinhala_term',
+                    'term': term_key,
+                    'variations': list(texts),
+                    'occurrences': [{'url': url, 'section': section, 'text': text}
+                                  for text, locations in texts.items() for url, section in locations]
+                })
     
     def analyze_banner_discrepancies(self):
         """Analyze discrepancies in banner text"""
@@ -307,18 +492,17 @@ class DiscrepancyAnalyzer:
         
         banner_texts = defaultdict(list)
         
-        for page in self.data.get('pages', []):
-            url = page.get('url', '')
-            for banner in page.get('banner_data', []):
-                if banner.get('is_banner', False):
-                    ocr_text = banner.get('ocr_text', '').strip()
+        for url, _, _, banner_data in self._iter_pages():
+            for banner in banner_data:
+                if banner['is_banner']:
+                    ocr_text = banner['ocr_text'].strip()
                     if ocr_text:
                         lang = self.detect_language(ocr_text)
                         banner_texts[self.normalize_text(ocr_text)].append({
                             'url': url,
                             'text': ocr_text,
                             'language': lang,
-                            'banner_src': banner.get('src', '')
+                            'banner_src': banner['src']
                         })
         
         # Find banner text inconsistencies
@@ -337,16 +521,10 @@ class DiscrepancyAnalyzer:
         """Find inconsistent terminology across the site"""
         self.logger.info("Analyzing terminology inconsistencies...")
         
-        # Common terms that should be consistent
-        common_terms = ['internet', 'broadband', 'package', 'plan', 'service', 'customer', 
-                       'support', 'contact', 'home', 'business', 'mobile', 'fiber']
+        # term -> form -> {url}
+        term_variations = defaultdict(lambda: defaultdict(set))
         
-        term_variations = defaultdict(set)
-        
-        for page in self.data.get('pages', []):
-            url = page.get('url', '')
-            text_content = page.get('text_content', {})
-            
+        for url, text_content, _, _ in self._iter_pages():
             all_text = []
             for section, content in text_content.items():
                 if isinstance(content, list):
@@ -360,60 +538,72 @@ class DiscrepancyAnalyzer:
             
             combined_text = ' '.join(all_text).lower()
             
-            for term in common_terms:
-                # Find all occurrences of the term with context
-                pattern = rf'\b\w*{term}\w*\b'
-                matches = re.findall(pattern, combined_text)
-                for match in matches:
-                    term_variations[term].add((match, url))
+            # Every word holding a term, grouped by the terms it holds
+            page_forms = defaultdict(set)
+            for match in self._term_re.finditer(combined_text):
+                word = match.group()
+                for term in self.common_terms:
+                    if term in word:
+                        page_forms[term].add(word)
+            
+            for term in self.common_terms:
+                if term in page_forms:
+                    forms = term_variations[term]
+                    for form in page_forms[term]:
+                        forms[form].add(url)
         
         # Report inconsistent terminology
-        for base_term, variations in term_variations.items():
-            unique_forms = set(var[0] for var in variations)
-            if len(unique_forms) > 1:
+        for base_term, forms in term_variations.items():
+            if len(forms) > 1:
                 self.discrepancies['inconsistent_terminology'].append({
                     'base_term': base_term,
-                    'variations': list(unique_forms),
-                    'occurrences': [{'form': var[0], 'url': var[1]} for var in variations]
+                    'variations': list(forms),
+                    'occurrences': [{'form': form, 'url': url} for form, urls in forms.items() for url in urls]
                 })
     
     def pages_are_similar(self, page1: Dict, page2: Dict) -> bool:
         """Check if two pages are similar enough to compare"""
-        url1 = page1.get('url', '')
-        url2 = page2.get('url', '')
+        url1 = page1['url']
+        url2 = page2['url']
         
         # Simple heuristic: pages with similar URLs
-        return self.similarity_score(url1, url2) > 0.3
+        return self.similarity_exceeds(url1, url2, 0.3)
     
-    def compare_translations(self, page1, page2, eng1, sin1, eng2, sin2):
+    def compare_translations(self, page1, page2, eng1, sin1, eng2, sin2, texts1=None, texts2=None):
         """Compare translations between similar pages"""
         # This is a simplified comparison - in practice, you'd need more sophisticated
         # translation matching algorithms
         
-        for section in ['title', 'headings', 'paragraphs']:
-            eng1_content = eng1.get(section, [])
-            sin1_content = sin1.get(section, [])
-            eng2_content = eng2.get(section, [])
-            sin2_content = sin2.get(section, [])
-            
+        # Section texts can be passed in when a page takes part in several comparisons
+        if texts1 is None:
+            texts1 = _section_texts(eng1, sin1)
+        if texts2 is None:
+            texts2 = _section_texts(eng2, sin2)
+        
+        for section in _COMPARED_SECTIONS:
             # Check if English content is similar but Sinhala content is different
-            if (eng1_content and eng2_content and sin1_content and sin2_content):
-                eng_similarity = self.similarity_score(str(eng1_content), str(eng2_content))
-                sin_similarity = self.similarity_score(str(sin1_content), str(sin2_content))
+            if section in texts1 and section in texts2:
+                eng1_text, sin1_text = texts1[section]
+                eng2_text, sin2_text = texts2[section]
+                if not _similarity_exceeds(eng1_text, eng2_text, 0.8):
+                    continue
+                
+                eng_similarity = _similarity_ratio(eng1_text, eng2_text)
+                sin_similarity = _similarity_ratio(sin1_text, sin2_text)
                 
-                if eng_similarity > 0.8 and sin_similarity < 0.5:
+                if sin_similarity < 0.5:
                     self.discrepancies['english_sinhala'].append({
                         'type': 'translation_inconsistency',
                         'section': section,
-                        'page1': page1.get('url'),
-                        'page2': page2.get('url'),
+                        'page1': page1['url'],
+                        'page2': page2['url'],
                         'english_content': {
-                            'page1': eng1_content,
-                            'page2': eng2_content
+                            'page1': eng1[section],
+                            'page2': eng2[section]
                         },
                         'sinhala_content': {
-                            'page1': sin1_content,
-                            'page2': sin2_content
+                            'page1': sin1[section],
+                            'page2': sin2[section]
                         },
                         'english_similarity': eng_similarity,
                         'sinhala_similarity': sin_similarity
@@ -423,15 +613,24 @@ class DiscrepancyAnalyzer:
         """Find formatting and structural discrepancies"""
         self.logger.info("Analyzing formatting issues...")
         
-        for page in self.data.get('pages', []):
-            url = page.get('url', '')
-            text_content = page.get('text_content', {})
-            
-            # Check for empty content
+        for url, text_content, _, _ in self._iter_pages():
+            # Check for empty content and collect repeated texts in one pass
             empty_sections = []
+            counts = {}
             for section, content in text_content.items():
-                if not content or (isinstance(content, list) and not any(content)):
+                if isinstance(content, list):
+                    if not any(content):
+                        empty_sections.append(section)
+                        continue
+                    texts = (str(item) for item in content if item)
+                elif not content:
                     empty_sections.append(section)
+                    continue
+                else:
+                    texts = (str(content),)
+                
+                for text in texts:
+                    counts[text] = counts.get(text, 0) + 1
             
             if empty_sections:
                 self.discrepancies['formatting_issues'].append({
@@ -449,21 +648,11 @@ class DiscrepancyAnalyzer:
                         'url': url,
                         'paragraph_index': i,
                         'length': len(para),
-                        'preview': para[:100] + '...'
+                        'preview': f"{para[:100]}..."
                     })
             
-            # Check for duplicate content within the same page
-            all_texts = []
-            for section, content in text_content.items():
-                if isinstance(content, list):
-                    all_texts.extend([str(item) for item in content if item])
-                elif content:
-                    all_texts.append(str(content))
-            
-            # Find duplicates
-            text_counts = Counter(all_texts)
-            duplicates = {text: count for text, count in text_counts.items() if count > 1}
-            
+            # Report duplicate content within the same page, in first-seen order
+            duplicates = {text: count for text, count in counts.items() if count > 1}
             if duplicates:
                 self.discrepancies['formatting_issues'].append({
                     'type': 'duplicate_content_within_page',
@@ -486,14 +675,21 @@ class DiscrepancyAnalyzer:
     
     def generate_summary_stats(self) -> Dict:
         """Generate summary statistics"""
-        total_pages = len(self.data.get('pages', []))
-        total_banners = sum(page.get('total_banners', 0) for page in self.data.get('pages', []))
-        total_images = sum(page.get('total_images', 0) for page in self.data.get('pages', []))
+        # Only the page totals are cached; the counts are cheap len() calls and
+        # must follow any find_* method that adds discrepancies later
+        if self._page_totals is None:
+            self._page_totals = (
+                len(self._pages),
+                sum(page['total_banners'] for page in self._pages),
+                sum(page['total_images'] for page in self._pages)
+            )
+        total_pages, total_banners, total_images = self._page_totals
         
         discrepancy_counts = {
             category: len(issues) for category, issues in self.discrepancies.items()
         }
         
+        # A new dict per call, so no caller can change another's stats
         return {
             'total_pages_analyzed': total_pages,
             'total_banners_found': total_banners,
@@ -502,158 +698,102 @@ class DiscrepancyAnalyzer:
             'total_discrepancies': sum(discrepancy_counts.values())
         }
     
-    def generate_detailed_report(self) -> str:
+    def generate_detailed_report(self, now: datetime = None) -> str:
         """Generate a detailed discrepancy report"""
         stats = self.generate_summary_stats()
-        
-        report = []
-        report.append("="*80)
-        report.append("SLT WEBSITE DISCREPANCY ANALYSIS REPORT")
-        report.append("="*80)
-        report.append(f"Generated on: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-        report.append(f"Source file: {self.json_file_path}")
-        report.append("")
+        if now is None:
+            now = datetime.now()
+        
+        buf = io.StringIO()
+        write = buf.write
+        write(f"{_SEP80}"
+              "SLT WEBSITE DISCREPANCY ANALYSIS REPORT\n"
+              f"{_SEP80}"
+              f"Generated on: {now:%Y-%m-%d %H:%M:%S}\n"
+              f"Source file: {self.json_file_path}\n"
+              "\n")
         
         # Summary
-        report.append("SUMMARY STATISTICS")
-        report.append("-" * 40)
-        report.append(f"Total pages analyzed: {stats['total_pages_analyzed']}")
-        report.append(f"Total banners found: {stats['total_banners_found']}")
-        report.append(f"Total images processed: {stats['total_images_processed']}")
-        report.append(f"Total discrepancies found: {stats['total_discrepancies']}")
-        report.append("")
+        write("SUMMARY STATISTICS\n"
+              f"{_SEP40}"
+              f"Total pages analyzed: {stats['total_pages_analyzed']}\n"
+              f"Total banners found: {stats['total_banners_found']}\n"
+              f"Total images processed: {stats['total_images_processed']}\n"
+              f"Total discrepancies found: {stats['total_discrepancies']}\n"
+              "\n")
         
         # Discrepancy breakdown
-        report.append("DISCREPANCY BREAKDOWN")
-        report.append("-" * 40)
+        write("DISCREPANCY BREAKDOWN\n")
+        write(_SEP40)
         for category, count in stats['discrepancy_counts'].items():
-            report.append(f"{category.replace('_', ' ').title()}: {count}")
-        report.append("")
+            write(f"{_CATEGORY_LABELS[category]}: {count}\n")
+        write("\n")
+        
+        # A clean run has no findings or recommendations to check
+        found_any = stats['total_discrepancies'] > 0
         
         # Detailed findings
-        if self.discrepancies['english_content']:
-            report.append("1. ENGLISH CONTENT DISCREPANCIES")
-            report.append("-" * 50)
-            for i, issue in enumerate(self.discrepancies['english_content'][:10], 1):  # Limit to 10
-                report.append(f"Issue {i}: {issue['type']}")
-                report.append(f"Term: {issue['term']}")
-                report.append(f"Variations found: {', '.join(issue['variations'])}")
-                report.append(f"Occurrences: {len(issue['occurrences'])}")
-                report.append("")
-        
-        if self.discrepancies['english_sinhala']:
-            report.append("2. ENGLISH-SINHALA TRANSLATION DISCREPANCIES")
-            report.append("-" * 50)
-            for i, issue in enumerate(self.discrepancies['english_sinhala'][:10], 1):
-                report.append(f"Issue {i}: {issue['type']}")
-                report.append(f"Pages: {issue['page1']} vs {issue['page2']}")
-                report.append(f"English similarity: {issue['english_similarity']:.2f}")
-                report.append(f"Sinhala similarity: {issue['sinhala_similarity']:.2f}")
-                report.append("")
-        
-        if self.discrepancies['sinhala_sinhala']:
-            report.append("3. SINHALA CONTENT DISCREPANCIES")
-            report.append("-" * 50)
-            for i, issue in enumerate(self.discrepancies['sinhala_sinhala'][:10], 1):
-                report.append(f"Issue {i}: {issue['type']}")
-                report.append(f"Term: {issue['term']}")
-                report.append(f"Variations found: {len(issue['variations'])}")
-                report.append(f"Occurrences: {len(issue['occurrences'])}")
-                report.append("")
-        
-        if self.discrepancies['banner_text']:
-            report.append("4. BANNER TEXT DISCREPANCIES")
-            report.append("-" * 50)
-            for i, issue in enumerate(self.discrepancies['banner_text'][:10], 1):
-                report.append(f"Issue {i}: {issue['type']}")
-                report.append(f"Variations: {', '.join(issue['variations'])}")
-                report.append(f"Found in {len(issue['occurrences'])} banners")
-                report.append("")
-        
-        if self.discrepancies['missing_translations']:
-            report.append("5. MISSING TRANSLATIONS")
-            report.append("-" * 50)
-            for i, issue in enumerate(self.discrepancies['missing_translations'][:10], 1):
-                report.append(f"Issue {i}: {issue['type']}")
-                report.append(f"URL: {issue['url']}")
-                report.append("")
-        
-        if self.discrepancies['inconsistent_terminology']:
-            report.append("6. INCONSISTENT TERMINOLOGY")
-            report.append("-" * 50)
-            for i, issue in enumerate(self.discrepancies['inconsistent_terminology'][:10], 1):
-                report.append(f"Issue {i}: Base term '{issue['base_term']}'")
-                report.append(f"Variations: {', '.join(issue['variations'])}")
-                report.append(f"Total occurrences: {len(issue['occurrences'])}")
-                report.append("")
-        
-        if self.discrepancies['formatting_issues']:
-            report.append("7. FORMATTING ISSUES")
-            report.append("-" * 50)
-            for i, issue in enumerate(self.discrepancies['formatting_issues'][:10], 1):
-                report.append(f"Issue {i}: {issue['type']}")
-                report.append(f"URL: {issue['url']}")
-                if 'empty_sections' in issue:
-                    report.append(f"Empty sections: {', '.join(issue['empty_sections'])}")
-                elif 'length' in issue:
-                    report.append(f"Paragraph length: {issue['length']} characters")
-                report.append("")
+        if found_any:
+            for key, heading, format_issue in _REPORT_SECTIONS:
+                issues = self.discrepancies[key]
+                if issues:
+                    write(heading)
+                    write(_SEP50)
+                    for i, issue in enumerate(islice(issues, 10), 1):  # Limit to 10
+                        write(format_issue(i, issue))
         
         # Recommendations
-        report.append("RECOMMENDATIONS")
-        report.append("-" * 40)
-        recommendations = []
-        
-        if stats['discrepancy_counts']['english_content'] > 0:
-            recommendations.append("• Establish a style guide for consistent English terminology")
-        
-        if stats['discrepancy_counts']['english_sinhala'] > 0:
-            recommendations.append("• Review translation processes to ensure consistency")
-        
-        if stats['discrepancy_counts']['sinhala_sinhala'] > 0:
-            recommendations.append("• Standardize Sinhala terminology across all pages")
-        
-        if stats['discrepancy_counts']['banner_text'] > 0:
-            recommendations.append("• Create consistent banner templates and text standards")
-        
-        if stats['discrepancy_counts']['missing_translations'] > 0:
-            recommendations.append("• Complete missing translations for bilingual consistency")
-        
-        if stats['discrepancy_counts']['formatting_issues'] > 0:
-            recommendations.append("• Review content structure and formatting guidelines")
-        
-        for rec in recommendations:
-            report.append(rec)
-        
-        report.append("")
-        report.append("="*80)
-        
-        return "\n".join(report)
+        write("RECOMMENDATIONS\n")
+        write(_SEP40)
+        if found_any:
+            counts = stats['discrepancy_counts']
+            for key, recommendation in _RECOMMENDATIONS:
+                if counts[key] > 0:
+                    write(recommendation)
+        
+        # No newline after the closing rule
+        write("\n")
+        write(_RULE80)
+        
+        return buf.getvalue()
     
     def save_report(self, filename: str = None):
         """Save the detailed report to a file"""
+        # One timestamp for the file name, the report header and the JSON
+        now = datetime.now()
         if not filename:
-            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+            timestamp = now.strftime('%Y%m%d_%H%M%S')
             filename = f'slt_discrepancy_report_{timestamp}.txt'
         
-        report_content = self.generate_detailed_report()
+        report_content = self.generate_detailed_report(now)
         
         try:
-            with open(filename, 'w', encoding='utf-8') as f:
-                f.write(report_content)
+            with _atomic_open(filename) as f:
+                f.write(report_content.encode('utf-8'))
+            
+            # A clean run has no raw discrepancy data worth saving
+            if self.generate_summary_stats()['total_discrepancies'] == 0:
+                self.logger.info("Report saved to %s\nNo discrepancies found, raw data not saved", filename)
+                return filename, None
             
             # Also save raw discrepancy data as JSON
-            json_filename = filename.replace('.txt', '.json')
-            with open(json_filename, 'w', encoding='utf-8') as f:
-                json.dump({
-                    'analysis_timestamp': datetime.now().isoformat(),
-                    'source_file': self.json_file_path,
-                    'summary_stats': self.generate_summary_stats(),
-                    'discrepancies': self.discrepancies
-                }, f, indent=2, ensure_ascii=False)
+            json_filename = f"{os.path.splitext(filename)[0]}.json"
+            header = {
+                'analysis_timestamp': now,
+                'source_file': self.json_file_path,
+                'summary_stats': self.generate_summary_stats()
+            }
+            if orjson is not None:
+                # Stream category by category rather than encoding the whole tree at once
+                with _atomic_open(json_filename) as f:
+                    _write_orjson_streamed(f, header, 'discrepancies', self.discrepancies)
+            else:
+                # json.dump already writes its output in chunks as it encodes
+                with _atomic_open(json_filename, 'w', encoding='utf-8') as f:
+                    json.dump({**header, 'discrepancies': self.discrepancies}, f, indent=2, ensure_ascii=False,
+                              default=_json_default)
             
-            self.logger.info(f"Report saved to {filename}")
-            self.logger.info(f"Raw data saved to {json_filename}")
+            self.logger.info("Report saved to %s\nRaw data saved to %s", filename, json_filename)
             
             return filename, json_filename
         
@@ -680,19 +820,19 @@ def main():
         report_file, json_file = analyzer.save_report()
         
         if report_file:
-            print(f"\nAnalysis completed successfully!")
-            print(f"Detailed report saved to: {report_file}")
-            print(f"Raw data saved to: {json_file}")
-            
-            # Print summary to console
+            # Print summary to console in a single write
             stats = analyzer.generate_summary_stats()
-            print(f"\nSUMMARY:")
-            print(f"Total pages analyzed: {stats['total_pages_analyzed']}")
-            print(f"Total discrepancies found: {stats['total_discrepancies']}")
-            
-            for category, count in stats['discrepancy_counts'].items():
-                if count > 0:
-                    print(f"- {category.replace('_', ' ').title()}: {count}")
+            lines = [
+                "\nAnalysis completed successfully!",
+                f"Detailed report saved to: {report_file}",
+                f"Raw data saved to: {json_file}" if json_file else "No discrepancies found, raw data not saved",
+                "\nSUMMARY:",
+                f"Total pages analyzed: {stats['total_pages_analyzed']}",
+                f"Total discrepancies found: {stats['total_discrepancies']}",
+            ]
+            lines.extend(f"- {_CATEGORY_LABELS[category]}: {count}"
+                         for category, count in stats['discrepancy_counts'].items() if count > 0)
+            print("\n".join(lines))
         else:
             print("Error generating report.")
     
@@ -10,16 +10,30 @@ import requests
 from bs4 import BeautifulSoup
 import re
 import time
-from urllib.parse import urljoin, urlparse, parse_qs
+from urllib.parse import urljoin, urlparse
 from collections import defaultdict, Counter
+from itertools import combinations
 import json
 from dataclasses import dataclass
-from typing import List, Dict, Set, Tuple, Optional
+from typing import List, Dict, Tuple, Optional
 import difflib
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
 import logging
 from datetime import datetime
-import hashlib
+
+try:
+    import lxml  # noqa: F401  optional, much faster C parser for BeautifulSoup
+    HTML_PARSER = 'lxml'
+except ImportError:
+    HTML_PARSER = 'html.parser'
+
+try:
+    import orjson
+except ImportError:  # optional, falls back to the standard json module
+    orjson = None
+
+# Every byte except the ASCII letters, stripped out to count English letters
+_NON_ASCII_ALPHA = bytes(b for b in range(256) if not (0x41 <= b <= 0x5A or 0x61 <= b <= 0x7A))
 
 # Configure logging
 logging.basicConfig(
@@ -32,7 +46,7 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-@dataclass
+@dataclass(slots=True)
 class PageContent:
     url: str
     title: str
@@ -43,10 +57,11 @@ class PageContent:
     images: List[str]
     links: List[str]
     prices: List[str]
+    price_spans: List[Tuple[int, int]]
     contact_info: List[str]
     services: List[str]
 
-@dataclass
+@dataclass(slots=True)
 class Contradiction:
     type: str
     page1: str
@@ -56,33 +71,61 @@ class Contradiction:
     severity: str
     description: str
 
+def _ratio_below(matcher: difflib.SequenceMatcher, threshold: float) -> bool:
+    """Whether the matcher's ratio is below threshold, trying its cheap upper bounds first"""
+    return (matcher.real_quick_ratio() < threshold
+            or matcher.quick_ratio() < threshold
+            or matcher.ratio() < threshold)
+
+def _dissimilar_pairs(texts: List[str], threshold: float) -> List[Tuple[int, int]]:
+    """Index pairs (i, j), i < j, of texts whose similarity ratio is below threshold"""
+    pairs = []
+    matcher = difflib.SequenceMatcher(None)
+    for j in range(1, len(texts)):
+        # SequenceMatcher indexes its second sequence, so build that once per text
+        matcher.set_seq2(texts[j])
+        for i in range(j):
+            matcher.set_seq1(texts[i])
+            if _ratio_below(matcher, threshold):
+                pairs.append((i, j))
+    pairs.sort()
+    return pairs
+
 class SLTWebsiteCrawler:
     def __init__(self):
         self.base_url = "https://www.slt.lk"
         self.visited_urls = set()
         self.pages_content = []
         self.contradictions = []
+        self._seen_contradiction_keys = set()
         self.session = requests.Session()
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         })
         
-        # Language detection patterns
-        self.sinhala_pattern = re.compile(r'[\u0D80-\u0DFF]+')
-        self.english_pattern = re.compile(r'[a-zA-Z]+')
-        
         # Content extraction patterns
         self.price_pattern = re.compile(r'Rs\.?\s*\d+(?:,\d{3})*(?:\.\d{2})?|\d+(?:,\d{3})*(?:\.\d{2})?\s*LKR', re.IGNORECASE)
         self.phone_pattern = re.compile(r'\b(?:\+94|0)(?:11|21|23|24|25|26|27|31|32|33|34|35|36|37|38|41|45|47|51|52|54|55|57|63|65|66|67|81|91)\d{7}\b')
         self.email_pattern = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b')
         
+        # Service keywords, matched together in one scan. Each keyword has its own
+        # group, so match.lastindex names it even when IGNORECASE matched text like
+        # 'ſervice' whose lower() is not the keyword
+        self.service_keywords = [
+            'broadband', 'internet', 'mobile', 'phone', 'landline', 'fiber',
+            'package', 'plan', 'subscription', 'service', 'connection'
+        ]
+        self.service_pattern = re.compile(
+            rf"\b(?:{'|'.join(f'({keyword})' for keyword in self.service_keywords)})", re.IGNORECASE
+        )
+        
     def get_page_content(self, url: str) -> Optional[PageContent]:
         """Extract content from a single page"""
         try:
             response = self.session.get(url, timeout=10)
             response.raise_for_status()
             
-            soup = BeautifulSoup(response.content, 'html.parser')
+            soup = BeautifulSoup(response.content, HTML_PARSER)
             
             # Remove script and style elements
             for script in soup(["script", "style"]):
@@ -91,9 +134,9 @@ class SLTWebsiteCrawler:
             # Extract basic information
             title = soup.find('title').get_text().strip() if soup.find('title') else ""
             
-            # Extract main content
-            content_areas = soup.find_all(['div', 'section', 'article', 'main'])
-            content = ' '.join([area.get_text().strip() for area in content_areas])
+            # Extract main content from the body as a whole, since nested content
+            # areas (a main inside a section inside a div) would each repeat its text
+            content = (soup.body or soup).get_text(separator=' ', strip=True)
             
             # Extract banners (common banner selectors)
             banner_selectors = [
@@ -106,9 +149,11 @@ class SLTWebsiteCrawler:
                 banner_elements = soup.select(selector)
                 banners.extend([banner.get_text().strip() for banner in banner_elements if banner.get_text().strip()])
             
-            # Detect language
-            sinhala_chars = len(self.sinhala_pattern.findall(content))
-            english_chars = len(self.english_pattern.findall(content))
+            # Detect language. Sinhala characters (0D80-0DFF) all start with E0 B6 or
+            # E0 B7 in UTF-8, so both scripts are counted in C without any regex matches
+            encoded = content.encode('utf-8', 'surrogatepass')
+            sinhala_chars = encoded.count(b'\xe0\xb6') + encoded.count(b'\xe0\xb7')
+            english_chars = len(content.encode('ascii', 'ignore').translate(None, _NON_ASCII_ALPHA))
             language = 'sinhala' if sinhala_chars > english_chars else 'english' if english_chars > 0 else 'unknown'
             
             # Extract metadata
@@ -124,8 +169,10 @@ class SLTWebsiteCrawler:
             # Extract links
             links = [link.get('href') for link in soup.find_all('a') if link.get('href')]
             
-            # Extract prices
-            prices = self.price_pattern.findall(content)
+            # Extract prices, keeping where each one was found in the content
+            price_matches = list(self.price_pattern.finditer(content))
+            prices = [match.group() for match in price_matches]
+            price_spans = [match.span() for match in price_matches]
             
             # Extract contact information
             phones = self.phone_pattern.findall(content)
@@ -133,14 +180,7 @@ class SLTWebsiteCrawler:
             contact_info = phones + emails
             
             # Extract service information (common service keywords)
-            service_keywords = [
-                'broadband', 'internet', 'mobile', 'phone', 'landline', 'fiber',
-                'package', 'plan', 'subscription', 'service', 'connection'
-            ]
-            services = []
-            for keyword in service_keywords:
-                matches = re.findall(rf'\b{keyword}[^.]*\.', content, re.IGNORECASE)
-                services.extend(matches)
+            services = self._find_services(content)
             
             return PageContent(
                 url=url,
@@ -152,6 +192,7 @@ class SLTWebsiteCrawler:
                 images=images,
                 links=links,
                 prices=prices,
+                price_spans=price_spans,
                 contact_info=contact_info,
                 services=services
             )
@@ -160,39 +201,32 @@ class SLTWebsiteCrawler:
             logger.error(f"Error crawling {url}: {str(e)}")
             return None
     
-    def discover_urls(self, start_url: str) -> Set[str]:
-        """Discover all URLs on the website"""
-        urls_to_visit = {start_url}
-        discovered_urls = set()
-        
-        while urls_to_visit:
-            current_url = urls_to_visit.pop()
-            
-            if current_url in discovered_urls or not self.is_slt_url(current_url):
-                continue
-                
-            discovered_urls.add(current_url)
-            logger.info(f"Discovering URLs from: {current_url}")
-            
-            try:
-                response = self.session.get(current_url, timeout=10)
-                soup = BeautifulSoup(response.content, 'html.parser')
-                
-                # Find all links
-                links = soup.find_all('a', href=True)
-                for link in links:
-                    href = link['href']
-                    full_url = urljoin(current_url, href)
-                    
-                    if self.is_slt_url(full_url) and full_url not in discovered_urls:
-                        urls_to_visit.add(full_url)
-                        
-                time.sleep(0.5)  # Be respectful to the server
-                
-            except Exception as e:
-                logger.error(f"Error discovering URLs from {current_url}: {str(e)}")
-        
-        return discovered_urls
+    def _find_services(self, content: str) -> List[str]:
+        """Find keyword sentences, grouped by keyword as separate per-keyword scans would"""
+        matches = {keyword: [] for keyword in self.service_keywords}
+        resume_at = dict.fromkeys(self.service_keywords, 0)
+        
+        # Keywords are plain letters, so no keyword can start inside another one and
+        # consuming just the keyword still sees every occurrence
+        for match in self.service_pattern.finditer(content):
+            keyword = self.service_keywords[match.lastindex - 1]
+            start = match.start()
+            # A keyword's next match starts after its previous one ends
+            if start >= resume_at[keyword]:
+                # The sentence runs to the next full stop, as [^.]*\. would
+                end = content.find('.', match.end())
+                if end == -1:
+                    break  # no full stop left for this or any later keyword
+                matches[keyword].append(content[start:end + 1])
+                resume_at[keyword] = end + 1
+        
+        return [service for keyword_matches in matches.values() for service in keyword_matches]
+    
+    def _fetch_page(self, url: str) -> Optional[PageContent]:
+        """Crawl one page, then pause before this worker fetches another"""
+        page_content = self.get_page_content(url)
+        time.sleep(0.5)  # Be respectful to the server
+        return page_content
     
     def is_slt_url(self, url: str) -> bool:
         """Check if URL belongs to SLT domain"""
@@ -205,34 +239,36 @@ class SLTWebsiteCrawler:
         """Main crawling function"""
         logger.info("Starting SLT website crawl...")
         
-        # Discover all URLs
-        all_urls = self.discover_urls(self.base_url)
-        logger.info(f"Discovered {len(all_urls)} URLs")
-        
-        # Crawl pages concurrently
+        # Crawl pages concurrently, discovering new URLs from each crawled page's links
+        # so that every page is fetched and parsed only once
         with ThreadPoolExecutor(max_workers=5) as executor:
-            future_to_url = {executor.submit(self.get_page_content, url): url for url in all_urls}
+            self.visited_urls.add(self.base_url)
+            future_to_url = {executor.submit(self._fetch_page, self.base_url): self.base_url}
             
-            for future in as_completed(future_to_url):
-                url = future_to_url[future]
-                try:
-                    page_content = future.result()
-                    if page_content:
-                        self.pages_content.append(page_content)
-                        logger.info(f"Crawled: {url}")
-                except Exception as e:
-                    logger.error(f"Error processing {url}: {str(e)}")
-                
-                time.sleep(0.1)  # Small delay between requests
+            while future_to_url:
+                done, _ = wait(future_to_url, return_when=FIRST_COMPLETED)
+                for future in done:
+                    url = future_to_url.pop(future)
+                    try:
+                        page_content = future.result()
+                        if page_content:
+                            self.pages_content.append(page_content)
+                            logger.info(f"Crawled: {url}")
+                            
+                            for href in page_content.links:
+                                full_url = urljoin(url, href)
+                                if full_url not in self.visited_urls and self.is_slt_url(full_url):
+                                    self.visited_urls.add(full_url)
+                                    future_to_url[executor.submit(self._fetch_page, full_url)] = full_url
+                    except Exception as e:
+                        logger.error(f"Error processing {url}: {str(e)}")
+        
+        logger.info(f"Discovered {len(self.visited_urls)} URLs")
     
     def find_contradictions(self):
         """Analyze content for contradictions"""
         logger.info("Analyzing content for contradictions...")
         
-        # Group pages by language
-        english_pages = [p for p in self.pages_content if p.language == 'english']
-        sinhala_pages = [p for p in self.pages_content if p.language == 'sinhala']
-        
         # Find price contradictions
         self._find_price_contradictions()
         
@@ -253,39 +289,39 @@ class SLTWebsiteCrawler:
         
         logger.info(f"Found {len(self.contradictions)} potential contradictions")
     
+    def _add_contradiction(self, contradiction: Contradiction):
+        """Record a contradiction unless an identical one was already found"""
+        key = (contradiction.type, contradiction.page1, contradiction.page2,
+               contradiction.content1, contradiction.content2, contradiction.description)
+        if key not in self._seen_contradiction_keys:
+            self._seen_contradiction_keys.add(key)
+            self.contradictions.append(contradiction)
+    
     def _find_price_contradictions(self):
         """Find contradictions in pricing information"""
         price_mentions = defaultdict(list)
         
         for page in self.pages_content:
-            for price in page.prices:
+            for price, (price_index, _) in zip(page.prices, page.price_spans):
                 # Extract service context around price
-                content_lower = page.content.lower()
-                price_index = content_lower.find(price.lower())
-                if price_index != -1:
-                    start = max(0, price_index - 100)
-                    end = min(len(content_lower), price_index + 100)
-                    context = page.content[start:end]
-                    
-                    price_mentions[price].append((page.url, context))
+                context = page.content[max(0, price_index - 100):price_index + 100]
+                price_mentions[price].append((page.url, context))
         
         # Check for same prices with different contexts
         for price, mentions in price_mentions.items():
             if len(mentions) > 1:
                 contexts = [mention[1] for mention in mentions]
-                for i in range(len(contexts)):
-                    for j in range(i + 1, len(contexts)):
-                        similarity = difflib.SequenceMatcher(None, contexts[i], contexts[j]).ratio()
-                        if similarity < 0.7:  # Different contexts for same price
-                            self.contradictions.append(Contradiction(
-                                type="price_contradiction",
-                                page1=mentions[i][0],
-                                page2=mentions[j][0],
-                                content1=contexts[i],
-                                content2=contexts[j],
-                                severity="medium",
-                                description=f"Same price ({price}) mentioned with different contexts"
-                            ))
+                # Different contexts for same price
+                for i, j in _dissimilar_pairs(contexts, 0.7):
+                    self._add_contradiction(Contradiction(
+                        type="price_contradiction",
+                        page1=mentions[i][0],
+                        page2=mentions[j][0],
+                        content1=contexts[i],
+                        content2=contexts[j],
+                        severity="medium",
+                        description=f"Same price ({price}) mentioned with different contexts"
+                    ))
     
     def _find_service_contradictions(self):
         """Find contradictions in service descriptions"""
@@ -298,39 +334,29 @@ class SLTWebsiteCrawler:
         
         # Check for contradictory service descriptions
         for service_key, descriptions in service_descriptions.items():
-            if len(descriptions) > 1:
-                contents = [desc[1] for desc in descriptions]
-                for i in range(len(contents)):
-                    for j in range(i + 1, len(contents)):
-                        similarity = difflib.SequenceMatcher(None, contents[i], contents[j]).ratio()
-                        if similarity < 0.5 and len(contents[i]) > 50 and len(contents[j]) > 50:
-                            self.contradictions.append(Contradiction(
-                                type="service_contradiction",
-                                page1=descriptions[i][0],
-                                page2=descriptions[j][0],
-                                content1=contents[i],
-                                content2=contents[j],
-                                severity="high",
-                                description=f"Contradictory service descriptions for similar services"
-                            ))
+            # Only substantial descriptions are worth comparing
+            long_descriptions = [desc for desc in descriptions if len(desc[1]) > 50]
+            if len(long_descriptions) > 1:
+                contents = [desc[1] for desc in long_descriptions]
+                for i, j in _dissimilar_pairs(contents, 0.5):
+                    self._add_contradiction(Contradiction(
+                        type="service_contradiction",
+                        page1=long_descriptions[i][0],
+                        page2=long_descriptions[j][0],
+                        content1=contents[i],
+                        content2=contents[j],
+                        severity="high",
+                        description=f"Contradictory service descriptions for similar services"
+                    ))
     
     def _find_contact_contradictions(self):
         """Find contradictions in contact information"""
-        all_contacts = []
-        for page in self.pages_content:
-            for contact in page.contact_info:
-                all_contacts.append((page.url, contact))
-        
-        # Group similar contact types
-        phone_contacts = [(url, contact) for url, contact in all_contacts if self.phone_pattern.match(contact)]
-        email_contacts = [(url, contact) for url, contact in all_contacts if self.email_pattern.match(contact)]
-        
         # Check for different contact info for same service
-        contact_counter = Counter([contact for _, contact in all_contacts])
+        contact_counter = Counter(contact for page in self.pages_content for contact in page.contact_info)
         inconsistent_contacts = [contact for contact, count in contact_counter.items() if count == 1]
         
         if len(inconsistent_contacts) > 5:  # Many unique contacts might indicate inconsistency
-            self.contradictions.append(Contradiction(
+            self._add_contradiction(Contradiction(
                 type="contact_inconsistency",
                 page1="multiple",
                 page2="multiple",
@@ -348,31 +374,35 @@ class SLTWebsiteCrawler:
                 if len(banner) > 20:  # Only consider substantial banners
                     banner_messages.append((page.url, banner))
         
-        # Look for contradictory promotional messages
-        for i in range(len(banner_messages)):
-            for j in range(i + 1, len(banner_messages)):
-                url1, banner1 = banner_messages[i]
-                url2, banner2 = banner_messages[j]
-                
-                # Check for contradictory promotional claims
-                promotional_words = ['best', 'fastest', 'cheapest', 'lowest', 'highest', 'maximum', 'minimum']
-                banner1_lower = banner1.lower()
-                banner2_lower = banner2.lower()
-                
-                for word in promotional_words:
-                    if word in banner1_lower and word in banner2_lower:
-                        if banner1_lower != banner2_lower:  # Different banners with same superlative
-                            similarity = difflib.SequenceMatcher(None, banner1, banner2).ratio()
-                            if similarity < 0.8:
-                                self.contradictions.append(Contradiction(
-                                    type="banner_contradiction",
-                                    page1=url1,
-                                    page2=url2,
-                                    content1=banner1,
-                                    content2=banner2,
-                                    severity="medium",
-                                    description=f"Contradictory promotional claims in banners"
-                                ))
+        # Look for contradictory promotional messages, only pairing banners that
+        # make the same promotional claim
+        promotional_words = ['best', 'fastest', 'cheapest', 'lowest', 'highest', 'maximum', 'minimum']
+        banners_lower = [banner.lower() for _, banner in banner_messages]
+        word_banners = defaultdict(list)
+        for index, banner_lower in enumerate(banners_lower):
+            for word in promotional_words:
+                if word in banner_lower:
+                    word_banners[word].append(index)
+        
+        candidate_pairs = set()
+        for indexes in word_banners.values():
+            candidate_pairs.update(combinations(indexes, 2))
+        
+        for i, j in sorted(candidate_pairs):
+            url1, banner1 = banner_messages[i]
+            url2, banner2 = banner_messages[j]
+            
+            if banners_lower[i] != banners_lower[j]:  # Different banners with same superlative
+                if _ratio_below(difflib.SequenceMatcher(None, banner1, banner2), 0.8):
+                    self._add_contradiction(Contradiction(
+                        type="banner_contradiction",
+                        page1=url1,
+                        page2=url2,
+                        content1=banner1,
+                        content2=banner2,
+                        severity="medium",
+                        description=f"Contradictory promotional claims in banners"
+                    ))
     
     def _find_language_version_differences(self):
         """Find differences between Sinhala and English versions"""
@@ -383,12 +413,14 @@ class SLTWebsiteCrawler:
         for eng_page in english_pages:
             for sin_page in sinhala_pages:
                 # Check if pages might be translations of each other
-                url_similarity = difflib.SequenceMatcher(None, eng_page.url, sin_page.url).ratio()
+                url_matcher = difflib.SequenceMatcher(None, eng_page.url, sin_page.url)
                 
-                if url_similarity > 0.8:  # Likely same page in different languages
+                # Likely same page in different languages; the cheap upper bounds rule most pairs out
+                if (url_matcher.real_quick_ratio() > 0.8 and url_matcher.quick_ratio() > 0.8
+                        and url_matcher.ratio() > 0.8):
                     # Compare prices
                     if set(eng_page.prices) != set(sin_page.prices):
-                        self.contradictions.append(Contradiction(
+                        self._add_contradiction(Contradiction(
                             type="language_price_difference",
                             page1=eng_page.url,
                             page2=sin_page.url,
@@ -400,7 +432,7 @@ class SLTWebsiteCrawler:
                     
                     # Compare contact information
                     if set(eng_page.contact_info) != set(sin_page.contact_info):
-                        self.contradictions.append(Contradiction(
+                        self._add_contradiction(Contradiction(
                             type="language_contact_difference",
                             page1=eng_page.url,
                             page2=sin_page.url,
@@ -412,21 +444,32 @@ class SLTWebsiteCrawler:
     
     def _find_title_contradictions(self):
         """Find contradictions in page titles"""
-        title_groups = defaultdict(list)
-        
-        for page in self.pages_content:
-            # Group by similar titles
-            title_words = set(page.title.lower().split())
-            for other_page in self.pages_content:
-                if page.url != other_page.url:
-                    other_title_words = set(other_page.title.lower().split())
-                    common_words = title_words.intersection(other_title_words)
-                    if len(common_words) >= 2:  # At least 2 common words
-                        title_key = ' '.join(sorted(common_words))
-                        title_groups[title_key].append(page)
+        # title key -> {page index: page}, so each page joins a group once however
+        # many other pages share that key with it
+        title_groups = defaultdict(dict)
+        title_words = [set(page.title.lower().split()) for page in self.pages_content]
+        
+        # Inverted index: title word -> indexes of the pages whose title contains it
+        word_pages = defaultdict(list)
+        for index, words in enumerate(title_words):
+            for word in words:
+                word_pages[word].append(index)
+        
+        for index, page in enumerate(self.pages_content):
+            # Group by similar titles, only looking at pages that share a title word
+            shared_counts = Counter()
+            for word in title_words[index]:
+                shared_counts.update(word_pages[word])
+            for other_index in sorted(shared_counts):
+                # At least 2 common words
+                if shared_counts[other_index] >= 2 and page.url != self.pages_content[other_index].url:
+                    common_words = title_words[index] & title_words[other_index]
+                    title_key = ' '.join(sorted(common_words))
+                    title_groups[title_key][index] = page
         
         # Check for contradictory information in similarly titled pages
-        for title_key, pages in title_groups.items():
+        for title_key, group in title_groups.items():
+            pages = list(group.values())
             if len(pages) > 1:
                 for i in range(len(pages)):
                     for j in range(i + 1, len(pages)):
@@ -434,7 +477,7 @@ class SLTWebsiteCrawler:
                         
                         # Compare key information
                         if set(page1.prices) != set(page2.prices) and page1.prices and page2.prices:
-                            self.contradictions.append(Contradiction(
+                            self._add_contradiction(Contradiction(
                                 type="similar_title_price_contradiction",
                                 page1=page1.url,
                                 page2=page2.url,
@@ -495,8 +538,13 @@ class SLTWebsiteCrawler:
         
         report = self.generate_report()
         
-        with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(report, f, indent=2, ensure_ascii=False)
+        if orjson is not None:
+            # orjson encodes straight to UTF-8 bytes, laid out like the json.dump call below
+            with open(filename, 'wb') as f:
+                f.write(orjson.dumps(report, option=orjson.OPT_INDENT_2))
+        else:
+            with open(filename, 'w', encoding='utf-8') as f:
+                json.dump(report, f, indent=2, ensure_ascii=False)
         
         logger.info(f"Report saved to {filename}")
         return filename